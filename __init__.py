@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 """BFRES importer/decoder for Blender.
 
-This script can also run from the command line without Blender,
-in which case it just prints useful information about the BFRES.
+The `bfres` package can also run from the command line without
+Blender (`python -m bfres --help`) to inspect files and extract
+their textures and models.
 """
 
 bl_info = {
@@ -35,6 +36,7 @@ from bpy.props import (
         StringProperty,
         BoolProperty,
         FloatProperty,
+        IntProperty,
         EnumProperty,
         CollectionProperty,
         )
@@ -115,6 +117,41 @@ class ImportBFRES(bpy.types.Operator, ImportHelper):
         description="Keep decompressed FRES files.",
         default=False)
 
+    zs_dict_path: StringProperty(name="Zstd Dictionary Pack",
+        description="ZsDic.pack.zs to decompress .zs files with. If empty, look for one near the imported file.",
+        subtype='FILE_PATH',
+        default="")
+
+    max_in_memory_mb: IntProperty(name="In-Memory Limit (MiB)",
+        description="Decompress files up to this size in memory; larger ones go through a temporary file.",
+        default=512, min=0)
+
+    validation: EnumProperty(name="Validation",
+        description="How strictly to check the file structure while reading",
+        items=(
+            ('strict',   "Strict",   "Check every structure as it's read"),
+            ('deferred', "Deferred", "Check after reading, and log a report"),
+            ('off',      "Off",      "Don't check; fastest, for known-good files"),
+        ),
+        default='strict')
+
+    decode_workers: IntProperty(name="Decode Processes",
+        description="Decode models and textures in this many processes; 0 or 1 decodes models in Blender's own process and textures on a background thread. Files already in the cache are read as needed instead",
+        default=0, min=0)
+
+    use_cache: BoolProperty(name="Cache Decoded Data",
+        description="Keep decompressed files, meshes and textures on disk, so importing the same file again is faster",
+        default=False)
+
+    cache_dir: StringProperty(name="Cache Directory",
+        description="Where to keep cached data. If empty, use the user's cache directory.",
+        subtype='DIR_PATH',
+        default="")
+
+    cache_size_mb: IntProperty(name="Cache Size (MiB)",
+        description="Remove the least recently used cached files when the cache grows past this size",
+        default=2048, min=0)
+
     parent_ob_name: StringProperty(name="Name of a parent object to which FSHP mesh objects will be added.")
 
     mat_name_prefix: StringProperty(name="Text prepended to material names to keep them unique.")
@@ -126,23 +163,18 @@ class ImportBFRES(bpy.types.Operator, ImportHelper):
         #user_preferences = context.user_preferences
         #addon_prefs = user_preferences.addons[self.bl_idname].preferences
         #print("PREFS:", user_preferences, addon_prefs)
-        keywords = self.as_keywords(ignore=("filter_glob", "directory", "ui_tab", "filepath", "files"))
 
         import os
-        from .bfres.Importer import Importer
-
-        log.info("Attempting To Import Linked files")
-        if self.import_tex_file:
-            texpath, ext = os.path.splitext(self.filepath)
-            texpath = texpath + '.Tex' + ext
-            if os.path.exists(texpath):
-                log.info("Importing linked file: %s", texpath)
-                importer = Importer(self, context)
-                importer.run(texpath, **keywords)     
-    
-        log.info("importing: %s", self.properties.filepath)
-        importer = Importer(self, context)
-        return importer.run(self.properties.filepath, **keywords)
+        from .bfres.Importer import BatchImporter
+
+        # import every selected file, or just the one given by
+        # filepath when run from a script.
+        paths = [os.path.join(self.directory, f.name)
+            for f in self.files if f.name]
+        if not paths: paths = [self.properties.filepath]
+        log.info("importing: %s", ', '.join(paths))
+        importer = BatchImporter(self, context)
+        return importer.run(paths)
 
 class BFRES_PT_import_textures(bpy.types.Panel):
     bl_space_type = 'FILE_BROWSER'
@@ -236,6 +268,13 @@ class BFRES_PT_import_misc(bpy.types.Panel):
         operator = sfile.active_operator
 
         layout.prop(operator, "save_decompressed")
+        layout.prop(operator, "zs_dict_path")
+        layout.prop(operator, "max_in_memory_mb")
+        layout.prop(operator, "validation")
+        layout.prop(operator, "decode_workers")
+        layout.prop(operator, "use_cache")
+        layout.prop(operator, "cache_dir")
+        layout.prop(operator, "cache_size_mb")
         layout.prop(operator, "dump_debug")
 
 
@@ -273,47 +312,5 @@ def unregister():
         bpy.utils.unregister_class(cls)
 
 
-# define main function, for running script outside of Blender.
-# XXX Has not been tested in new versions, needs a rewrite
-'''def main():
-    if len(sys.argv) < 2:
-        print("Usage: %s file" % sys.argv[0])
-        return
-
-    InPath = sys.argv[1]
-    InFile = None
-
-    # try to decompress the input to a temporary file.
-    file  = BinaryFile(InPath, 'rb')
-    magic = file.read(4)
-    file.seek(0) # rewind
-    if magic in (b'Yaz0', b'Yaz1'):
-        print("Decompressing YAZ0...")
-
-        # create temp file and write it
-        InFile = tempfile.TemporaryFile()
-        YAZ0.decompressFile(file, InFile)
-        InFile.seek(0)
-        InFile = BinaryFile(InFile)
-        file.close()
-        file = None
-
-    elif magic == b'FRES':
-        print("Input already decompressed")
-        InFile = BinaryFile(file)
-
-    else:
-        file.close()
-        file = None
-        raise TypeError("Unsupported file type: "+str(magic))
-
-    # decode decompressed file
-    print("Decoding FRES...")
-    fres = FRES.FRES(InFile)
-    fres.decode()
-    print("FRES contents:\n" + fres.dump())'''
-
-
 if __name__ == '__main__':
-    # main() # see above function
     register()
\ No newline at end of file
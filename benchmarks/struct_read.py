@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Benchmark reading BinaryStruct records.
+
+Compares `readFromFile()`, which reads each run of plain fields with
+one precompiled struct, with reading every field on its own (seek,
+read, convert), which is how records were read before the layouts
+were compiled. Prints microseconds per record.
+
+Usage: python benchmarks/struct_read.py [--count N] [--repeat N]
+"""
+import argparse
+import logging
+import os.path
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bfres.BinaryFile import BinaryFile, MappedFile
+from bfres.FRES import SwitchHeader10 as FresHeader
+from bfres.FRES.FMDL import Header10 as FmdlHeader
+from bfres.FRES.FMDL.FVTX import Header10 as FvtxHeader
+from bfres.FRES.FMDL.FMAT import SamplerInfo
+from bfres.FRES.RLT import Entry as RltEntry
+from bfres.BNTX import Header as BntxHeader
+from bfres.BNTX.NX import NX as NxHeader
+from bfres.Common.StringTable import Header as StrTabHeader
+
+# (name, struct class, magic at the start of the record)
+structs = (
+    ('BNTX header', BntxHeader,   b'BNTX'),
+    ('NX header',   NxHeader,     b'NX  '),
+    ('_STR header', StrTabHeader, b'_STR'),
+    ('FRES header', FresHeader,   b'FRES    '),
+    ('FMDL header', FmdlHeader,   b'FMDL'),
+    ('FVTX header', FvtxHeader,   b'FVTX'),
+    ('RLT entry',   RltEntry,     b''),
+    ('SamplerInfo', SamplerInfo,  b''),
+)
+
+
+def sampleData(magic:bytes) -> bytes:
+    """Make a buffer to read a record from.
+
+    Offsets all point to 0x2000, where there's a string, so string
+    lookups are included in the timing.
+    """
+    buf = bytearray(b'\x00\x20\x00\x00\x00\x00\x00\x00' * 0x800)
+    buf[0:len(magic)] = magic
+    buf[0x2000:0x2008] = b'\x04\x00abcd\x00\x00'
+    return bytes(buf)
+
+
+def readPerField(st, file, offset:int) -> dict:
+    """Read a record one field at a time."""
+    res = {}
+    for field in st.orderedFields:
+        st._readField(file, field, offset + field['offset'], res)
+    return res
+
+
+def timePerRecord(func, count:int, repeat:int) -> float:
+    """Best time of `repeat` runs of `count` calls, in microseconds
+    per call.
+    """
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        for j in range(count): func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best: best = elapsed
+    return best / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--count', type=int, default=5000,
+        help="records read per run (default: %(default)d)")
+    parser.add_argument('--repeat', type=int, default=5,
+        help="runs; the best is shown (default: %(default)d)")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    print("%-12s %-10s %10s %10s %8s" % ('', '', 'per-field', 'compiled',
+        'speedup'))
+    for name, cls, magic in structs:
+        data = sampleData(magic)
+        for fileType in (BinaryFile, MappedFile):
+            file = fileType(data)
+            file.validation = 'off' # time the reading only
+            st   = cls()
+            old  = timePerRecord(lambda: readPerField(st, file, 0),
+                args.count, args.repeat)
+            new  = timePerRecord(lambda: st.readFromFile(file, 0),
+                args.count, args.repeat)
+            print("%-12s %-10s %8.1fus %8.1fus %7.1fx" % (name,
+                fileType.__name__, old, new, old / new))
+
+
+if __name__ == '__main__':
+    main()
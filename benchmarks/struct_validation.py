@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Benchmark the validation policies.
+
+Reads records with each policy ('strict', 'deferred', 'off') and
+prints microseconds per record. For 'deferred', the cost of the
+later `validationReport()` is shown in brackets.
+
+Given FRES/BNTX files (optionally compressed), also times decoding
+each whole file with each policy.
+
+Usage: python benchmarks/struct_validation.py [FILE ...]
+"""
+import argparse
+import logging
+import os.path
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bfres.BinaryFile import MappedFile
+from bfres.BinaryStruct import VALIDATION_POLICIES
+from bfres.CLI import loadFile
+from bfres import FRES, BNTX
+from struct_read import structs, sampleData, timePerRecord
+
+
+def benchmarkRecords(count:int, repeat:int):
+    print("%-12s %10s %18s %10s" % ('', *VALIDATION_POLICIES))
+    for name, cls, magic in structs:
+        data = bytearray(sampleData(magic))
+        # some bad padding, so there are problems to report
+        for i in range(0x100, 0x400, 3): data[i] = 0xAA
+        row = []
+        for policy in VALIDATION_POLICIES:
+            file = MappedFile(bytes(data))
+            file.validation = policy
+            st   = cls()
+            def read():
+                if policy == 'deferred': file.pendingChecks.clear()
+                for i in range(count): st.readFromFile(file, 0)
+            usec = timePerRecord(read, 1, repeat) / count
+            text = '%8.1fus' % usec
+            if policy == 'deferred':
+                start = time.perf_counter()
+                file.validationReport()
+                text += ' (+%5.1fus)' % (
+                    (time.perf_counter() - start) / count * 1e6)
+            row.append(text)
+        print("%-12s %10s %18s %10s" % (name, *row))
+
+
+def benchmarkFile(path:str, repeat:int):
+    data = loadFile(path)
+    data = bytes(data.view(data.size, 0))
+    cls  = {b'FRES': FRES.FRES, b'BNTX': BNTX.BNTX}.get(data[0:4])
+    if cls is None:
+        print("%s: not a FRES or BNTX file" % path)
+        return
+    print("%s (%d bytes):" % (path, len(data)))
+    for policy in VALIDATION_POLICIES:
+        best, report = None, 0
+        for i in range(repeat):
+            obj   = cls(MappedFile(data, name=path), policy)
+            start = time.perf_counter()
+            obj.decode()
+            elapsed = time.perf_counter() - start
+            if best is None or elapsed < best:
+                best  = elapsed
+                start = time.perf_counter()
+                issues = obj.validationReport()
+                report = time.perf_counter() - start
+        text = "  %-9s %8.1fms" % (policy, best * 1000)
+        if policy == 'deferred':
+            text += " (+%.1fms report, %d problems)" % (report * 1000,
+                len(issues))
+        print(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('files', nargs='*', metavar='FILE',
+        help="FRES/BNTX files to decode")
+    parser.add_argument('--count', type=int, default=5000,
+        help="records read per run (default: %(default)d)")
+    parser.add_argument('--repeat', type=int, default=5,
+        help="runs; the best is shown (default: %(default)d)")
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+
+    benchmarkRecords(args.count, args.repeat)
+    for path in args.files:
+        benchmarkFile(path, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
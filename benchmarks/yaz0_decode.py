@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""Benchmark the YAZ0 decoders.
+
+Compares the in-memory buffer decoder (`decompressBuffer`) and the
+streaming decoder (`decompressStream`) with the byte-at-a-time
+generator decoder they replaced, and prints MB/s of output.
+
+Usage: python benchmarks/yaz0_decode.py [FILE.szs ...]
+With no files, synthetic data is compressed with the 'fast' encoder.
+"""
+import argparse
+import io
+import os.path
+import random
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bfres.YAZ0 import Encoder, decompressBuffer, decompressStream
+
+
+class GeneratorDecoder:
+    """The original decoder: seeks and reads the input once per
+    byte, and yields the output one byte at a time. Kept here only
+    to compare against.
+    """
+    def __init__(self, file:io.BytesIO):
+        self.file     = file
+        self.src_pos  = 16
+        self.dest_pos = 0
+        file.seek(4)
+        self.size     = int.from_bytes(file.read(4), 'big')
+        self._output  = []
+        self._outputStart = 0
+
+    def _nextByte(self):
+        self.file.seek(self.src_pos)
+        self.src_pos += 1
+        return self.file.read(1)[0]
+
+    def _outputByte(self, b):
+        if type(b) is int: b = bytes((b,))
+        self._output.append(b)
+        excess = len(self._output) - 0x1111
+        if excess > 0:
+            self._output = self._output[-0x1111:]
+            self._outputStart += excess
+        self.dest_pos += 1
+        return b
+
+    def bytes(self):
+        code, code_len = 0, 0
+        while self.dest_pos < self.size:
+            if not code_len:
+                code = self._nextByte()
+                code_len = 8
+            if code & 0x80:
+                yield self._outputByte(self._nextByte())
+            else:
+                b1 = self._nextByte()
+                b2 = self._nextByte()
+                copy_src = self.dest_pos - ((((b1 & 0x0F) << 8) | b2) & 0xFFF) - 1
+                n = b1 >> 4
+                if n: n += 2
+                else: n = self._nextByte() + 0x12
+                for i in range(n):
+                    yield self._outputByte(
+                        self._output[copy_src - self._outputStart])
+                    copy_src += 1
+            code <<= 1
+            code_len -= 1
+
+
+def sampleData(size:int, seed:int=0) -> bytes:
+    """Make data that compresses roughly like model files: runs of
+    zeros, repeated records and some noise.
+    """
+    rnd   = random.Random(seed)
+    words = [rnd.randbytes(rnd.randrange(4, 32)) for i in range(64)]
+    res   = bytearray()
+    while len(res) < size:
+        kind = rnd.random()
+        if   kind < 0.2: res += bytes(rnd.randrange(16, 256))
+        elif kind < 0.8: res += rnd.choice(words)
+        else: res += rnd.randbytes(rnd.randrange(1, 64))
+    return bytes(res[:size])
+
+
+def timeBest(func, repeat:int) -> float:
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best: best = elapsed
+    return best
+
+
+def benchmark(name:str, comp:bytes, repeat:int, oldLimit:int):
+    size = int.from_bytes(comp[4:8], 'big')
+    print("%s: %d -> %d bytes" % (name, len(comp), size))
+
+    t = timeBest(lambda: decompressBuffer(comp, size), repeat)
+    print("  %-10s %8.2f MB/s" % ('buffer', size / t / 1e6))
+    t = timeBest(lambda: b''.join(decompressStream(
+        io.BytesIO(comp[16:]), size)), repeat)
+    print("  %-10s %8.2f MB/s" % ('stream', size / t / 1e6))
+
+    # the old decoder is far slower, so only time the first part.
+    n = min(size, oldLimit)
+    def old():
+        gen = GeneratorDecoder(io.BytesIO(comp)).bytes()
+        for i in range(n): next(gen)
+    t = timeBest(old, 1)
+    print("  %-10s %8.2f MB/s (first %d bytes)" % ('generator', n / t / 1e6, n))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('files', nargs='*', metavar='FILE',
+        help="YAZ0-compressed files to decode")
+    parser.add_argument('--size', type=int, default=4*1024*1024,
+        help="size of the synthetic data (default: %(default)d)")
+    parser.add_argument('--repeat', type=int, default=3,
+        help="runs per decoder; the best is shown (default: %(default)d)")
+    parser.add_argument('--old-limit', type=int, default=256*1024,
+        help="bytes to decode with the generator decoder (default: %(default)d)")
+    args = parser.parse_args()
+
+    if not args.files:
+        data = sampleData(args.size)
+        benchmark('synthetic', Encoder('fast').encode(data), args.repeat,
+            args.old_limit)
+    for path in args.files:
+        with open(path, 'rb') as file: comp = file.read()
+        benchmark(path, comp, args.repeat, args.old_limit)
+
+
+if __name__ == '__main__':
+    main()
@@ -77,6 +77,8 @@ class BRTI:
     def __init__(self):
         self.file       = None
         self.mipOffsets = []
+        self._mipData   = None
+        self._pixels    = None
 
 
     def dump(self):
@@ -96,26 +98,19 @@ class BRTI:
             int(self.header['fmt_dtype']),
             self.header['fmt_dtype'].name))
         res.append("Fmt Type:        %2d %s" % (
-            self.header['fmt_type'].fmt_id,
+            self.header['fmt_type'].id,
             type(self.header['fmt_type']).__name__))
         res.append("Access Flags:    0x%08X" % self.header['access_flags'])
         res.append("Width x Height:  %5d/%5d" % (self.width, self.height))
         res.append("Depth:           %3d" % self.header['depth'])
         res.append("Array Cnt:       %3d" % self.header['array_cnt'])
         res.append("Block Height:    %8d" % self.header['texture_layout'])
-        res.append("Unk38:           %04X %04X" % (
-            self.header['unk38'], self.header['unk3A']))
-        res.append("Unk3C:           %d, %d, %d, %d, %d" % (
-            self.header['image_size'], self.header['unk40'],
-            self.header['unk44'], self.header['unk48'],
-            self.header['unk4C']))
+        res.append("Layout 2:        0x%08X" % self.header['texture_layout2'])
         res.append("Data Len:        0x%08X" % self.header['data_len'])
         res.append("Alignment:       0x%08X" % self.header['alignment'])
         res.append("Channel Types:   %s, %s, %s, %s" % (
-            self.header['channel_types'][0].name,
-            self.header['channel_types'][1].name,
-            self.header['channel_types'][2].name,
-            self.header['channel_types'][3].name))
+            tuple(BRTI.ChannelType(v).name
+                for v in self.header['channel_types'])))
         res.append("Texture Type:    0x%08X" % self.header['tex_type'])
         res.append("Parent Offs:     0x%08X" % self.header['parent_offset'])
         res.append("Ptrs Offs:       0x%08X" % self.header['ptrs_offset'])
@@ -145,11 +140,31 @@ class BRTI:
         log.debug("Reading texture %s (%s)", self.name, type(self.format_).__name__)
 
         self._readMipmaps()
-        self._readData()
-        self.pixels = self.format_.decompress(self)
         return self
 
 
+    @property
+    def pixels(self):
+        """The deswizzled and decompressed image data.
+
+        Decoded on first access, so that textures which are already
+        cached don't need decoding.
+        """
+        if self._pixels is None and self.file is not None:
+            self._pixels = self.format_.decompress(self)
+        return self._pixels
+
+
+    @property
+    def mipData(self):
+        """The deswizzled, but still compressed, data of the first
+        mipmap level.
+        """
+        if self._mipData is None and self.file is not None:
+            self._readData()
+        return self._mipData
+
+
     def _readMipmaps(self):
         """Read the mipmap images."""
         for i in range(self.header['mipmap_cnt']):
@@ -158,24 +173,45 @@ class BRTI:
             self.mipOffsets.append(entry)
 
 
-    def _readData(self):
-        """Read the raw image data."""
-        base = self.file.read('Q', self.header['ptrs_offset'])
-        self.data = self.file.read(self.header['data_len'], base)
-
+    def mipLayout(self) -> dict:
+        """Get the arguments to `deswizzleMip()` for the first
+        mipmap level.
+        """
         linesPerBlockHeight = (1 << self.blockHeightLog2) * 8
         blockHeightShift = 0
-        mipOffset = self.mipOffsets[0]
 
         size = DIV_ROUND_UP(self.width, self.blkWidth) * DIV_ROUND_UP(self.height, self.blkHeight) * self.bpp
 
         if pow2_round_up(DIV_ROUND_UP(self.height, self.blkHeight)) < linesPerBlockHeight:
             blockHeightShift += 1
 
-        result = deswizzle(
-            self.width, self.height, self.blkWidth, self.blkHeight, self.bpp, self.tile_mode,
-            max(0, self.blockHeightLog2 - blockHeightShift), self.data,
-        )
+        return {
+            'width':     self.width,
+            'height':    self.height,
+            'blkWidth':  self.blkWidth,
+            'blkHeight': self.blkHeight,
+            'bpp':       self.bpp,
+            'tileMode':  self.tile_mode,
+            'blockHeightLog2': max(0, self.blockHeightLog2 - blockHeightShift),
+            'size':      size,
+        }
+
+
+    def readRawData(self) -> memoryview:
+        """Read the raw (swizzled) image data."""
+        base = self.file.read('Q', self.header['ptrs_offset'])
+        self.data = self.file.view(self.header['data_len'], base)
+        return self.data
+
+
+    def _readData(self):
+        """Read and deswizzle the first mipmap level."""
+        self._mipData = deswizzleMip(self.readRawData(), **self.mipLayout())
+
 
-        self.mipData = result[:size]
-            
\ No newline at end of file
+def deswizzleMip(data, width:int, height:int, blkWidth:int, blkHeight:int,
+bpp:int, tileMode:int, blockHeightLog2:int, size:int) -> bytearray:
+    """Deswizzle a mipmap level; see `BRTI.mipLayout()`."""
+    result = deswizzle(width, height, blkWidth, blkHeight, bpp, tileMode,
+        blockHeightLog2, data)
+    return result[:size]
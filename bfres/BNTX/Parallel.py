@@ -0,0 +1,84 @@
+import logging; log = logging.getLogger(__name__)
+import multiprocessing
+import types
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from ..FRES.Parallel import WorkerFunc, startingWorkers
+from .BRTI import deswizzleMip
+from .pixelfmt import TextureFormat
+
+# Decode textures in the background.
+#
+# Deswizzling and decompressing don't need anything from the BNTX
+# but the raw data and a few header fields, so those are all that's
+# sent to the worker; the BRTI itself stays in the calling process.
+
+
+def decodeTexture(fmtId:int, dtype:int, layout:dict, data,
+flip:bool=False) -> np.ndarray:
+    """Decode the first mipmap level of a texture.
+
+    fmtId: Texture format ID.
+    dtype: Texture data type (`BRTI.TextureDataType`).
+    layout: Result of `BRTI.mipLayout()`.
+    data: Raw image data, from `BRTI.readRawData()`.
+    flip: Whether to put the bottom row first, as Blender wants.
+
+    Returns a float32 RGBA array of shape (height, width, 4).
+    """
+    width, height = layout['width'], layout['height']
+    # stands in for the BRTI, which the formats read these from
+    tex = types.SimpleNamespace(width=width, height=height,
+        header={'fmt_dtype': dtype}, mipData=deswizzleMip(data, **layout))
+    fmt    = TextureFormat.get(fmtId)()
+    pixels = fmt.decodePixels(fmt.decompress(tex))
+    pixels = np.asarray(pixels, dtype=np.float32).reshape(height, width, 4)
+    if flip: pixels = np.flipud(pixels)
+    return np.ascontiguousarray(pixels)
+
+
+class TextureDecoder:
+    """Decodes textures in the background."""
+
+    def __init__(self, workers:int=1):
+        """Create TextureDecoder.
+
+        workers: If more than 1, decode in this many processes.
+            If 1, decode in a background thread. If 0, decode
+            immediately in `submit()`.
+        """
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(workers,
+                mp_context=multiprocessing.get_context('spawn'))
+            log.info("Decoding textures in %d processes", workers)
+        elif workers == 1:
+            self.pool = ThreadPoolExecutor(1, thread_name_prefix='bfres-tex')
+        else: self.pool = None
+
+
+    def submit(self, tex, flip:bool=False) -> Future:
+        """Start decoding a BRTI; see `decodeTexture()`.
+
+        Returns a Future for the decoded pixels.
+        """
+        data = tex.readRawData()
+        if isinstance(self.pool, ProcessPoolExecutor):
+            data = bytes(data) # can't send a view of our file
+        args = (tex.fmt_id, int(tex.header['fmt_dtype']), tex.mipLayout(),
+            data, flip)
+        if isinstance(self.pool, ProcessPoolExecutor):
+            with startingWorkers():
+                return self.pool.submit(WorkerFunc(decodeTexture), *args)
+        if self.pool is not None:
+            return self.pool.submit(decodeTexture, *args)
+
+        future = Future()
+        try: future.set_result(decodeTexture(*args))
+        except Exception as ex: future.set_exception(ex)
+        return future
+
+
+    def shutdown(self):
+        """Stop the workers, abandoning textures not yet decoded."""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
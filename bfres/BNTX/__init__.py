@@ -1,5 +1,5 @@
 import logging; log = logging.getLogger(__name__)
-from ..BinaryStruct import BinaryStruct, BinaryObject
+from ..BinaryStruct import BinaryStruct, BinaryObject, VALIDATION_POLICIES
 from ..BinaryStruct.Padding import Padding
 from ..BinaryStruct.StringOffset import StringOffset
 from ..BinaryStruct.Switch import Offset32, Offset64, String
@@ -31,7 +31,16 @@ class BNTX:
     """BNTX texture pack."""
     Header = Header
 
-    def __init__(self, file:BinaryFile):
+    def __init__(self, file:BinaryFile, validation:str='strict'):
+        """Create BNTX.
+
+        file: The file to read.
+        validation: How strictly to check the structures read;
+            one of BinaryStruct.VALIDATION_POLICIES.
+        """
+        if validation not in VALIDATION_POLICIES:
+            raise ValueError("Unknown validation policy '%s'" % validation)
+        file.validation = validation
         self.file     = file
         self.textures = []
         self.header   = self.Header().readFromFile(file)
@@ -55,13 +64,17 @@ class BNTX:
         #    self.header['version'], self.byteOrder)
 
 
+    def validationReport(self) -> list:
+        """Get problems found by deferred validation."""
+        return self.file.validationReport()
+
+
     def dump(self):
         """Dump to string for debug."""
         res = []
         res.append("  Name:            '%s'" % self.name)
         res.append("Version:           0x%04X, %s endian" % (
             self.header['version'], self.byteOrder))
-        res.append("Data Len:          0x%06X" % self.header['data_len'])
         res.append("Str Offs:          0x%06X" % self.header['strings_offs'])
         res.append("Reloc Offs:        0x%06X" % self.header['reloc_offs'])
         res.append("File Size:         0x%06X" % self.header['file_size'])
@@ -75,10 +88,15 @@ class BNTX:
         return '\n'.join(res).replace('\n', '\n  ')
 
 
-    def decode(self):
-        """Decode objects from the file."""
-        self.strings = StringTable().readFromFile(self.file,
+    def decode(self, eagerStrings:bool=False):
+        """Decode objects from the file.
+
+        eagerStrings: Decode the whole string table up front, rather
+            than as strings are needed. Useful for dumps.
+        """
+        self.strings = StringTable(eagerStrings).readFromFile(self.file,
             self.header['strings_offs'])
+        self.file.stringPool = self.strings
 
         self.nx = NX().readFromFile(self.file,
             self.Header.size)
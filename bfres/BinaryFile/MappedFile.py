@@ -0,0 +1,205 @@
+import logging; log = logging.getLogger(__name__)
+import io
+import mmap
+import struct
+from . import BinaryFile
+
+_structs = {} # format string => struct.Struct
+
+
+def getStruct(fmt:str) -> struct.Struct:
+    """Get a compiled struct for the given format string."""
+    st = _structs.get(fmt)
+    if st is None:
+        st = struct.Struct(fmt)
+        _structs[fmt] = st
+    return st
+
+
+class BufferReader(io.RawIOBase):
+    """Minimal file-like object over a memoryview.
+
+    Used as the `file` of a MappedFile, so code that wants a plain
+    stream (eg decompressors) still works, and so the read position
+    lives in one place.
+    """
+
+    def __init__(self, buffer:memoryview, name=None, owner=None):
+        super().__init__()
+        self.buffer = buffer
+        self.name   = name
+        self.pos    = 0
+        self._owner = owner # mmap and/or file to close with us
+
+
+    def readable(self): return True
+    def seekable(self): return True
+
+
+    def seek(self, pos:int, whence:int=0) -> int:
+        if   whence == 1: pos += self.pos
+        elif whence == 2: pos += len(self.buffer)
+        if pos < 0: raise ValueError("Negative seek position %d" % pos)
+        self.pos = pos
+        return pos
+
+
+    def tell(self) -> int:
+        return self.pos
+
+
+    def read(self, size:int=-1) -> bytes:
+        start = self.pos
+        if size is None or size < 0: end = len(self.buffer)
+        else: end = min(start + size, len(self.buffer))
+        self.pos = max(start, end)
+        return bytes(self.buffer[start:end])
+
+
+    def readinto(self, b) -> int:
+        data = self.buffer[self.pos:self.pos+len(b)]
+        n = len(data)
+        b[0:n] = data
+        self.pos += n
+        return n
+
+
+    def close(self):
+        if self.closed: return
+        super().close()
+        self.buffer.release()
+        for obj in self._owner or ():
+            try: obj.close()
+            except BufferError:
+                # someone still holds a view of the mapping;
+                # it will be unmapped when they let go of it.
+                pass
+
+
+class MappedFile(BinaryFile):
+    """BinaryFile backed by memory or a memory-mapped file.
+
+    Struct reads are served with `struct.unpack_from()` directly
+    from the buffer without seeking, and `view()` returns byte
+    ranges without copying them.
+    """
+
+    def __init__(self, file, endian='little', name=None):
+        """Create MappedFile.
+
+        file: A path, a file object (which will be mapped), or a
+            bytes-like object holding the whole file in memory.
+        name: Name to report for in-memory files.
+        """
+        if type(file) is str: file = open(file, 'rb')
+        self.path = None # set if mapped from a file on disk
+        owner = []
+        if isinstance(file, (bytes, bytearray, memoryview)):
+            buffer = memoryview(file)
+        elif isinstance(file, io.BytesIO):
+            buffer = file.getbuffer()
+        else: # a real file
+            owner.append(file)
+            try:
+                mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                owner.insert(0, mm)
+                buffer = memoryview(mm)
+                self.path = getattr(file, 'name', None)
+            except (ValueError, OSError, io.UnsupportedOperation):
+                # empty files can't be mapped; neither can pipes.
+                file.seek(0)
+                buffer = memoryview(file.read())
+        if buffer.ndim != 1 or buffer.itemsize != 1:
+            buffer = buffer.cast('B')
+
+        name = name or getattr(file, 'name', '<memory>')
+        self.file   = BufferReader(buffer, name, owner)
+        self.buffer = buffer
+        self.name   = name
+        self.endian = endian
+        self.size   = len(buffer)
+
+        self.validation    = 'strict'
+        self.pendingChecks = []
+        self._issues       = []
+        self.stringPool    = None # StringTable, once read
+
+
+    def read(self, fmt:(int,str)=-1, pos:int=None, count:int=1):
+        """Read from the file.
+
+        Same as `BinaryFile.read()`, but format strings and byte
+        counts are served straight from the buffer.
+        """
+        reader = self.file
+        if pos is None: pos = reader.pos
+        if count == 1: # common case, skip building a list
+            if type(fmt) is int:
+                end = self.size if fmt < 0 else min(pos + fmt, self.size)
+                reader.pos = max(pos, end)
+                return bytes(self.buffer[pos:end])
+            if type(fmt) is str:
+                st = _structs.get(fmt) or getStruct(fmt)
+                try: r = st.unpack_from(self.buffer, pos)
+                except struct.error as ex:
+                    log.error("Failed to unpack format '%s' from offset 0x%X (max 0x%X): %s",
+                        fmt, pos, self.size, ex)
+                    raise
+                reader.pos = pos + st.size
+                if len(r) == 1: r = r[0] # grumble
+                return r
+
+        if   count <  0: raise ValueError("Count cannot be negative")
+        elif count == 0: return []
+
+        if type(fmt) is str: # struct format string
+            st  = getStruct(fmt)
+            res = []
+            try:
+                for i in range(count):
+                    r = st.unpack_from(self.buffer, pos)
+                    if len(r) == 1: r = r[0] # grumble
+                    res.append(r)
+                    pos += st.size
+            except struct.error as ex:
+                log.error("Failed to unpack format '%s' from offset 0x%X (max 0x%X): %s",
+                    fmt, pos, self.size, ex)
+                raise
+            reader.pos = pos
+            if count == 1: return res[0]
+            return res
+
+        elif type(fmt) is int: # size in bytes
+            res = []
+            for i in range(count):
+                if fmt < 0: end = self.size
+                else: end = min(pos + fmt, self.size)
+                res.append(bytes(self.buffer[pos:end]))
+                pos = max(pos, end)
+            reader.pos = pos
+            if count == 1: return res[0]
+            return res
+
+        # structs and objects read field by field via seek/read.
+        reader.pos = pos
+        return super().read(fmt, None, count)
+
+
+    def unpack(self, st:struct.Struct, pos:int=None) -> tuple:
+        """Read a precompiled struct straight from the buffer."""
+        if pos is None: pos = self.file.pos
+        res = st.unpack_from(self.buffer, pos)
+        self.file.pos = pos + st.size
+        return res
+
+
+    def view(self, size:int, pos:int=None) -> memoryview:
+        """Get a read-only view of `size` bytes without copying."""
+        if pos is None: pos = self.file.pos
+        end = min(pos + size, self.size)
+        self.file.pos = max(pos, end)
+        return self.buffer[pos:end].toreadonly()
+
+
+    def __str__(self):
+        return "<MappedFile(%s) at 0x%x>" % (self.name, id(self))
@@ -1,7 +1,45 @@
 import logging; log = logging.getLogger(__name__)
+import io
 import struct
+import numpy as np
 from ..BinaryStruct import BinaryStruct, BinaryObject
 
+_arrayTypes = { # struct format char => numpy type
+    'b': 'i1', 'B': 'u1', 'h': 'i2', 'H': 'u2',
+    'i': 'i4', 'I': 'u4', 'l': 'i4', 'L': 'u4',
+    'q': 'i8', 'Q': 'u8', 'e': 'f2', 'f': 'f4', 'd': 'f8',
+}
+_arrayOrders = {'<':'<', '>':'>', '!':'>', '=':'=', '@':'='}
+
+
+def arrayType(fmt:str):
+    """Get the NumPy dtype and values per record for a struct
+    format whose values all have the same type, eg '<H' or '3f'.
+
+    Returns (dtype, count), or (None, 0) if the format mixes types
+    or uses native sizes that differ from the standard ones (eg 'L'
+    is 8 bytes on most 64-bit systems).
+    """
+    fullFmt = fmt
+    order = _arrayOrders.get(fmt[0:1])
+    if order is None: order = '='
+    else: fmt = fmt[1:]
+    typ, count, num = None, 0, ''
+    for c in fmt:
+        if c.isdigit():
+            num += c
+            continue
+        if c not in _arrayTypes or (typ is not None and c != typ):
+            return None, 0
+        typ    = c
+        count += int(num or 1)
+        num    = ''
+    if typ is None: return None, 0
+    dtype = np.dtype(order + _arrayTypes[typ])
+    if dtype.itemsize * count != struct.calcsize(fullFmt):
+        return None, 0
+    return dtype, count
+
 class BinaryFile:
     """Wrapper around files that provides binary I/O methods."""
 
@@ -16,12 +54,26 @@ class BinaryFile:
         'little': '<',
     }
 
-    def __init__(self, file, mode='rb', endian='little'):
+    def __init__(self, file, mode='rb', endian='little', name=None):
+        """Create BinaryFile.
+
+        file: A path, a file object, or a bytes-like object holding
+            the whole file in memory.
+        name: Name to report for in-memory files.
+        """
         if type(file) is str: file = open(file, mode)
+        elif isinstance(file, (bytes, bytearray, memoryview)):
+            file = io.BytesIO(file)
         self.file   = file
-        self.name   = file.name
+        self.name   = name or getattr(file, 'name', '<memory>')
         self.endian = endian
 
+        # see BinaryStruct.VALIDATION_POLICIES
+        self.validation    = 'strict'
+        self.pendingChecks = [] # (struct, record, offset)
+        self._issues       = []
+        self.stringPool    = None # StringTable, once read
+
         # get size
         pos = file.tell()
         self.size = self.seek(0, 'end')
@@ -119,6 +171,75 @@ class BinaryFile:
         return res
 
 
+    def readArray(self, fmt:str, pos:int=None, count:int=1):
+        """Read `count` consecutive records in one go.
+
+        fmt:   `struct` format string of one record.
+        pos:   Position to seek to first. (optional)
+        count: Number of records to read.
+
+        If every value in `fmt` has the same type (eg '<H' or '3f'),
+        returns a NumPy array of shape (count,), or (count, n) for
+        records holding n values. The array is read-only if it shares
+        memory with a mapped file. Otherwise, returns a list of tuples.
+        """
+        if pos is None: pos = self.tell()
+        if count < 0: raise ValueError("Count cannot be negative")
+        dtype, n = arrayType(fmt)
+        size = struct.calcsize(fmt)
+        data = self.view(size * count, pos)
+        if len(data) < size * count:
+            log.error("Failed to read %d x '%s' from offset 0x%X (max 0x%X)",
+                count, fmt, pos, self.size)
+            raise struct.error("Array of %d x '%s' at 0x%X is out of bounds" % (
+                count, fmt, pos))
+
+        if dtype is None:
+            return list(struct.iter_unpack(fmt, data)) if size else []
+        res = np.frombuffer(data, dtype=dtype, count=count*n)
+        if n != 1: res = res.reshape(count, n)
+        return res
+
+
+    def unpack(self, st:struct.Struct, pos:int=None) -> tuple:
+        """Read a precompiled struct.
+
+        st:  The `struct.Struct` to read.
+        pos: Position to seek to first. (optional)
+
+        Returns the unpacked tuple.
+        """
+        if pos is not None: self.seek(pos)
+        return st.unpack(self.file.read(st.size))
+
+
+    def view(self, size:int, pos:int=None) -> memoryview:
+        """Read `size` bytes as a memoryview.
+
+        This copies; MappedFile overrides it to avoid that.
+        """
+        return memoryview(self.read(size, pos))
+
+
+    def validationReport(self) -> list:
+        """Run the struct checks deferred by the 'deferred'
+        validation policy.
+
+        Returns a list of every problem found so far.
+        """
+        pending, self.pendingChecks = self.pendingChecks, []
+        for st, res, offset in pending:
+            self._issues += st.validate(res, offset, self.size)
+        return list(self._issues)
+
+
+    def addIssues(self, issues:list):
+        """Add problems found elsewhere, eg by worker processes
+        reading this file, to the validation report.
+        """
+        self._issues += issues
+
+
     def tell(self) -> int:
         """Get current read position."""
         return self.file.tell()
@@ -134,3 +255,6 @@ class BinaryFile:
 
     def __str__(self):
         return "<BinaryFile(%s) at 0x%x>" % (self.name, id(self))
+
+
+from .MappedFile import MappedFile
@@ -0,0 +1,121 @@
+import logging; log = logging.getLogger(__name__)
+
+
+def _rebuildRecord(structType, items):
+    """Unpickle a Record."""
+    return structType().recordType(items)
+
+
+class Record:
+    """A record read by a BinaryStruct.
+
+    Each struct layout gets its own Record subclass, with its fields
+    in `__slots__`, which takes far less memory than a dict per
+    record. Records still behave like the dicts they replace:
+    `rec['name']`, `get()`, `keys()`, `items()`, `update()`, `in`...
+    Keys that aren't fields of the layout (eg merged in with
+    `update()`) are kept in a dict.
+    """
+    __slots__  = ('_extra',)
+    _fields    = ()          # field names, in order
+    _slotNames = frozenset() # field names stored in slots
+    _struct    = None        # BinaryStruct class, if any, for pickling
+
+    def __init__(self, *args, **kwargs):
+        self._extra = None
+        if args or kwargs: self.update(*args, **kwargs)
+
+
+    def __getitem__(self, key):
+        if key in self._slotNames:
+            try: return getattr(self, key)
+            except AttributeError: raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+
+    def __setitem__(self, key, val):
+        if key in self._slotNames: setattr(self, key, val)
+        else:
+            if self._extra is None: self._extra = {}
+            self._extra[key] = val
+
+
+    def __delitem__(self, key):
+        if key in self._slotNames:
+            try: delattr(self, key)
+            except AttributeError: raise KeyError(key) from None
+        elif self._extra is not None and key in self._extra:
+            del self._extra[key]
+        else: raise KeyError(key)
+
+
+    def __contains__(self, key):
+        if key in self._slotNames: return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+
+    def get(self, key, default=None):
+        try: return self[key]
+        except (KeyError, TypeError): return default
+
+
+    def keys(self):
+        res = [k for k in self._fields
+            if k not in self._slotNames or hasattr(self, k)]
+        if self._extra is not None:
+            res += [k for k in self._extra if k not in self._slotNames]
+        return res
+
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+
+    def update(self, other=(), **kwargs):
+        if hasattr(other, 'keys'):
+            for key in other.keys(): self[key] = other[key]
+        else:
+            for key, val in other: self[key] = val
+        for key, val in kwargs.items(): self[key] = val
+
+
+    def __iter__(self): return iter(self.keys())
+    def __len__(self): return len(self.keys())
+
+
+    def __eq__(self, other):
+        if not hasattr(other, 'keys'): return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+
+    def __reduce__(self):
+        if self._struct is None: # no class to rebuild from
+            return (dict, (self.items(),))
+        return (_rebuildRecord, (self._struct, self.items()))
+
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+def makeRecordType(name:str, fields, structType=None) -> type:
+    """Create a Record subclass for the given field names.
+
+    structType: The BinaryStruct class these records come from;
+        used to pickle them.
+    """
+    slots = tuple(f for f in fields
+        if f.isidentifier() and not hasattr(Record, f))
+    return type(name + 'Record', (Record,), {
+        '__slots__':  slots,
+        '__module__': __name__,
+        '_fields':    tuple(fields),
+        '_slotNames': frozenset(slots),
+        '_struct':    structType,
+    })
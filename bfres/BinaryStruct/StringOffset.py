@@ -40,6 +40,21 @@ class StringOffset(Offset):
         if self.fmt is not None:
             # get the offset
             offset = super().readFromFile(file, offset)
+        return self.readAt(file, offset)
+
+
+    def readAt(self, file:BinaryFile, offset:int) -> (str,bytes):
+        """Read the string at the given offset."""
+        # look in the file's string pool first
+        pool = getattr(file, 'stringPool', None)
+        nullTerminated = self.lenprefix is None
+        if pool is not None and offset is not None \
+        and self.encoding == pool.encoding \
+        and self.lenprefix in (None, pool.lenprefix):
+            s = pool.get(offset, nullTerminated)
+            if s is not None and (self.maxlen is None or len(s) < self.maxlen):
+                return s
+        else: pool = None
 
         # get the string
         if offset is not None: file.seek(offset)
@@ -56,6 +71,7 @@ class StringOffset(Offset):
                 offset, self.encoding, s[0:15])
             raise
 
+        if pool is not None: s = pool.add(offset, s, nullTerminated)
         return s
 
 
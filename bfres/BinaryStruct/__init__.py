@@ -1,7 +1,27 @@
 import logging; log = logging.getLogger(__name__)
 import struct
+import sys
 #from BinaryFile import BinaryFile
 from .BinaryObject import BinaryObject
+from .Record import Record, makeRecordType
+
+# How much checking readFromFile() does, set per file:
+# 'strict':   Check magic, offsets and padding after every read.
+# 'deferred': Check magic; queue the rest for `validationReport()`.
+# 'off':      No checks, for trusted files.
+VALIDATION_POLICIES = ('strict', 'deferred', 'off')
+
+# attributes shared by every instance of a struct class
+_layoutAttrs = ('fields', 'orderedFields', 'size', 'recordType', '_steps',
+    '_offsetFields', '_paddingFields')
+
+_byteOrders = {
+    '@': '<' if sys.byteorder == 'little' else '>',
+    '=': '<' if sys.byteorder == 'little' else '>',
+    '<': '<',
+    '>': '>',
+    '!': '>',
+}
 
 
 class BinaryStruct:
@@ -15,10 +35,43 @@ class BinaryStruct:
         fields: List of field definitions.
         size: Expected size of structure. Produces a warning message
             if actual size specified by `fields` does not match this.
+
+        If no fields are given, the subclass's `fields` are used, and
+        the resulting layout is built once and shared by every
+        instance of the subclass.
         """
+        if len(fields) == 0 and size is None:
+            cls    = type(self)
+            layout = cls.__dict__.get('_layout')
+            if layout is None:
+                self._buildLayout(self.fields, None, cls)
+                cls._layout = {k: getattr(self, k) for k in _layoutAttrs}
+            else:
+                self.__dict__.update(layout)
+            return
+
         # if no fields given, use those defined in the subclass.
         if len(fields) == 0: fields = self.fields
+        self._buildLayout(fields, size, None)
+
+
+    def __getstate__(self):
+        # the layout holds readers and compiled structs, which can't
+        # be pickled; it's rebuilt from the class when unpickling.
+        state = self.__dict__.copy()
+        if self.recordType._struct is type(self):
+            for key in _layoutAttrs:
+                if key != 'size': state.pop(key, None)
+        return state
+
+
+    def __setstate__(self, state):
+        if 'recordType' not in state: BinaryStruct.__init__(self)
+        self.__dict__.update(state)
 
+
+    def _buildLayout(self, fields, size, structType):
+        """Build the field table for the given field definitions."""
         self.fields = {}
         self.orderedFields = []
 
@@ -65,6 +118,23 @@ class BinaryStruct:
             assert _checkSize == self.size, \
                 "Struct size is 0x%X but should be 0x%X" % (
                     self.size, _checkSize)
+        self.recordType = makeRecordType(type(self).__name__,
+            [f['name'] for f in self.orderedFields], structType)
+        for field in self.orderedFields:
+            field['slot'] = field['name'] in self.recordType._slotNames
+
+        # fields to validate
+        from .Offset import Offset
+        from .Padding import Padding
+        from .StringOffset import StringOffset
+        # string offsets are Offset, but resolve to strings
+        self._offsetFields = tuple(f['name'] for f in self.orderedFields
+            if isinstance(f['type'], Offset)
+            and not isinstance(f['type'], StringOffset))
+        self._paddingFields = tuple(
+            (f['name'], f['offset'], f['type'].value)
+            for f in self.orderedFields if isinstance(f['type'], Padding))
+        self._compile()
 
 
     def _makeReader(self, typ):
@@ -72,39 +142,163 @@ class BinaryStruct:
         return lambda file: file.read(typ)
 
 
+    def _plainFormat(self, typ):
+        """Get the struct format of a field type, if it can be read
+        as part of a larger struct.
+
+        Returns (byteOrder, format, asList, resolve), or None if the
+        field needs its own reader. `resolve`, if not None, is called
+        as resolve(file, value) to get the field's value, eg to look
+        up the string that a string offset points to.
+        """
+        from .Padding import Padding
+        from .StringOffset import StringOffset
+        from .Vector import Vector
+        count, resolve = 1, None
+        if type(typ) is str: fmt = typ
+        elif isinstance(typ, Vector):
+            fmt, count = typ.fmt, typ.count
+        elif isinstance(typ, StringOffset) and typ.fmt is not None \
+        and type(typ).readFromFile is StringOffset.readFromFile:
+            fmt, resolve = typ.fmt, typ.readAt
+        elif isinstance(typ, Padding) or \
+        type(typ).readFromFile is BinaryObject.readFromFile:
+            fmt = typ.fmt # plain value, eg an Offset
+        else: return None
+
+        native = fmt[0:1] not in '=<>!'
+        order  = _byteOrders.get(fmt[0:1])
+        if order is None: order = _byteOrders['@']
+        else: fmt = fmt[1:]
+        fmt = fmt * count
+
+        # native formats can differ in size and alignment from the
+        # standard ones (eg 'L'); those can't be merged.
+        if native and struct.calcsize('@'+fmt) != struct.calcsize(order+fmt):
+            return None
+        return order, fmt, count != 1, resolve
+
+
+    def _compile(self):
+        """Coalesce runs of plain fields into precompiled structs.
+
+        Builds `self._steps`, a list of (struct, fields). `struct` is
+        a `struct.Struct` that reads every field in `fields` in one
+        call, and `fields` is a list of
+        (field, numValues, asList, resolve).
+        For fields that need their own reader, `struct` is None and
+        `fields` is the field itself.
+        """
+        steps = []
+        run, runFmt, runOrder = [], '', None
+        def flush():
+            if run: steps.append((struct.Struct(runOrder+runFmt), list(run)))
+
+        for field in self.orderedFields:
+            plain = self._plainFormat(field['type'])
+            if plain is None:
+                flush()
+                run, runFmt, runOrder = [], '', None
+                steps.append((None, field))
+                continue
+
+            order, fmt, asList, resolve = plain
+            if order != runOrder:
+                flush()
+                run, runFmt, runOrder = [], '', order
+            n = len(struct.unpack(order+fmt, bytes(struct.calcsize(order+fmt))))
+            run.append((field, n, asList, resolve))
+            runFmt += fmt
+        flush()
+        self._steps = steps
+
+
+    def _readField(self, file, field, offset, res):
+        """Read one field using its own reader."""
+        try:
+            # read the field
+            #log.debug("Read %s.%s from 0x%X => 0x%X",
+            #    type(self).__name__, field['name'],
+            #    field['offset'], offset)
+            file.seek(offset)
+            func = field['read']
+            data = func(file)
+
+            if type(data) is tuple and len(data) == 1:
+                data = data[0] # grumble
+
+            if field['conv']: data = field['conv'](data)
+            res[field['name']] = data
+        except Exception as ex:
+            log.error("Failed reading field '%s' from offset 0x%X: %s",
+                field['name'], offset, ex)
+
+
     def readFromFile(self, file, offset=None):
-        """Read this struct from given file."""
+        """Read this struct from given file.
+
+        How the result is checked depends on the file's `validation`
+        policy; see `VALIDATION_POLICIES`.
+        """
         if offset is not None: file.seek(offset)
         offset = file.tell()
+        start  = offset
+
+        res = self.recordType()
+        for st, fields in self._steps:
+            if st is None:
+                self._readField(file, fields, offset, res)
+                offset += fields['size']
+                continue
 
-        res = {}
-        for field in self.orderedFields:
             try:
-                # read the field
-                #log.debug("Read %s.%s from 0x%X => 0x%X",
-                #    type(self).__name__, field['name'],
-                #    field['offset'], offset)
-                file.seek(offset)
-                func = field['read']
-                data = func(file)
-
-                if type(data) is tuple and len(data) == 1:
-                    data = data[0] # grumble
-
-                if field['conv']: data = field['conv'](data)
-                res[field['name']] = data
-                offset += field['size']
-            except Exception as ex:
-                log.error("Failed reading field '%s' from offset 0x%X: %s",
-                    field['name'], offset, ex)
+                vals = file.unpack(st, offset)
+                i    = 0
+                for field, n, asList, resolve in fields:
+                    if   asList: data = list(vals[i:i+n])
+                    elif n == 1: data = vals[i]
+                    else:        data = vals[i:i+n]
+                    i += n
+                    if resolve: data = resolve(file, data)
+                    if field['conv']: data = field['conv'](data)
+                    if field['slot']: setattr(res, field['name'], data)
+                    else: res[field['name']] = data
+            except Exception:
+                # read them one by one to find and report the problem
+                pos = offset
+                for field, n, asList, resolve in fields:
+                    self._readField(file, field, pos, res)
+                    pos += field['size']
+            offset += st.size
+
+        # string lookups in the last run may have moved the file.
+        if self._steps and self._steps[-1][0] is not None:
+            file.seek(offset)
 
         #log.debug("Read %s: %s", type(self).__name__, res)
-        self._checkMagic(res)
-        self._checkOffsets(res, file)
-        self._checkPadding(res)
+        policy = getattr(file, 'validation', 'strict')
+        if policy == 'strict':
+            self._checkMagic(res)
+            self._checkOffsets(res, file.size)
+            self._checkPadding(res, start)
+        elif policy == 'deferred':
+            self._checkMagic(res) # cheap, and tells us the file is wrong
+            if self._offsetFields or self._paddingFields:
+                file.pendingChecks.append((self, res, start))
         return res
 
 
+    def validate(self, res, offset:int, fileSize:int) -> list:
+        """Run the offset and padding checks on a record read earlier.
+
+        Returns a list of problem descriptions.
+        """
+        issues = []
+        self._checkOffsets(res, fileSize, issues)
+        self._checkPadding(res, offset, issues)
+        return issues
+
+
     def _checkMagic(self, res):
         """Verify magic value."""
         if self.magic is None: return
@@ -123,40 +317,42 @@ class BinaryStruct:
                 type(self).__name__, str(magic), str(valid)))
 
 
-    def _checkOffsets(self, res, file):
-        """Check if offsets are sane."""
-        from .Offset import Offset
-        for field in self.orderedFields:
-            typ  = field['type']
-            name = field['name']
-            if isinstance(typ, Offset):
-                try:
-                    val = int(res.get(name, None))
-                    if val < 0 or val > file.size:
-                        # don't warn on == file.size because some files
-                        # have an offset field that's their own size
-                        log.warning("%s: Offset '%s' = 0x%X but EOF = 0x%X",
-                            type(self).__name__, name, val, file.size+1)
-                except (TypeError, ValueError):
-                    # string offsets are Offset but not numbers
-                    pass
-
-
-    def _checkPadding(self, res):
-        """Check if padding values are as expected."""
-        from .Padding import Padding
-        for field in self.orderedFields:
-            typ  = field['type']
-            name = field['name']
+    def _checkOffsets(self, res, fileSize:int, issues:list=None):
+        """Check if offsets are sane.
+
+        issues: List to add problems to. If None, they're logged.
+        """
+        for name in self._offsetFields:
+            try:
+                val = int(res.get(name, None))
+            except (TypeError, ValueError):
+                # string offsets are Offset but not numbers
+                continue
+            if val < 0 or val > fileSize:
+                # don't warn on == file size because some files
+                # have an offset field that's their own size
+                msg = "%s: Offset '%s' = 0x%X but EOF = 0x%X" % (
+                    type(self).__name__, name, val, fileSize+1)
+                if issues is None: log.warning("%s", msg)
+                else: issues.append(msg)
+
+
+    def _checkPadding(self, res, offset:int=0, issues:list=None):
+        """Check if padding values are as expected.
+
+        offset: Position of the struct in the file.
+        issues: List to add problems to. If None, they're logged.
+        """
+        for name, fieldOffs, expected in self._paddingFields:
             data = res.get(name, None)
-            if isinstance(typ, Padding):
-                expected = typ.value
-                for i, byte in enumerate(data):
-                    if byte != expected:
-                        log.debug("%s: Padding byte at 0x%X is 0x%02X, should be 0x%02X",
-                            type(self).__name__,
-                            field['offset']+i, byte, expected
-                        )
+            if not data or data.count(expected) == len(data): continue
+            for i, byte in enumerate(data):
+                if byte != expected:
+                    msg = "%s: Padding byte at 0x%X is 0x%02X, should be 0x%02X" % (
+                        type(self).__name__, offset+fieldOffs+i,
+                        byte, expected)
+                    if issues is None: log.debug("%s", msg)
+                    else: issues.append(msg)
 
 
     def dump(self, data:dict) -> str:
@@ -0,0 +1,182 @@
+import logging; log = logging.getLogger(__name__)
+import json
+import os.path
+import numpy as np
+from ..FRES.FMDL.Attribute.types import normalizeArray
+
+# glTF primitive mode of each LOD primitive format
+gltfModes = {
+    'point_list':    0,
+    'line_list':     1,
+    'line_strip':    3,
+    'triangle_list': 4,
+}
+
+# glTF attribute name of each FVTX attribute name prefix
+gltfAttrs = {
+    '_p': 'POSITION',
+    '_n': 'NORMAL',
+    '_u': 'TEXCOORD_',
+    '_c': 'COLOR_',
+}
+
+
+def _lods(fshp, allLods:bool) -> list:
+    return fshp.lods if allLods else fshp.lods[0:1]
+
+
+def writeNpz(path:str, fmdl, allLods:bool=False):
+    """Save the vertex and index arrays of a model as .npz.
+
+    Arrays are named 'shape.attribute' (eg 'Body._p0') and
+    'shape.lodN' for the indices of each LOD.
+    """
+    arrays = {}
+    attrs  = {}
+    for fshp in fmdl.fshps:
+        iVtx = fshp.header['fvtx_idx']
+        if iVtx not in attrs: attrs[iVtx] = fmdl.fvtxs[iVtx].vertices
+        for name, arr in attrs[iVtx].items():
+            arrays['%s.%s' % (fshp.name, name)] = arr
+        for i, lod in enumerate(_lods(fshp, allLods)):
+            arrays['%s.lod%d' % (fshp.name, i)] = lod.idx_buf
+    with open(path, 'wb') as file:
+        np.savez(file, **arrays)
+
+
+class GltfBuilder:
+    """Builds a glTF 2.0 file with a separate binary buffer."""
+
+    def __init__(self, binName:str):
+        self.binName = binName
+        self.data    = bytearray()
+        self.gltf    = {
+            'asset':       {'version': '2.0', 'generator': 'bfres'},
+            'scene':       0,
+            'scenes':      [{'nodes': []}],
+            'nodes':       [],
+            'meshes':      [],
+            'materials':   [],
+            'buffers':     [],
+            'bufferViews': [],
+            'accessors':   [],
+        }
+
+
+    def addAccessor(self, arr:np.ndarray, typ:str, target:int=None,
+    bounds:bool=False) -> int:
+        """Add an array to the buffer.
+
+        arr: float32 or uint32 array.
+        typ: glTF accessor type, eg 'VEC3'.
+        target: glTF buffer view target.
+        bounds: Whether to record min/max values.
+
+        Returns the accessor index.
+        """
+        arr = np.ascontiguousarray(arr)
+        self.data += bytes(-len(self.data) % 4)
+        view = {'buffer': 0, 'byteOffset': len(self.data),
+            'byteLength': arr.nbytes}
+        if target is not None: view['target'] = target
+        self.data += arr.tobytes()
+        self.gltf['bufferViews'].append(view)
+
+        acc = {
+            'bufferView':    len(self.gltf['bufferViews']) - 1,
+            'componentType': 5126 if arr.dtype == np.float32 else 5125,
+            'count':         len(arr),
+            'type':          typ,
+        }
+        if bounds and len(arr):
+            acc['min'] = arr.min(axis=0).tolist()
+            acc['max'] = arr.max(axis=0).tolist()
+        self.gltf['accessors'].append(acc)
+        return len(self.gltf['accessors']) - 1
+
+
+    def addVertexAttrs(self, fvtx, attrs:dict) -> dict:
+        """Add the vertex attributes that glTF supports.
+
+        Returns a dict of glTF attribute name => accessor index.
+        """
+        res = {}
+        for name, arr in attrs.items():
+            gName = gltfAttrs.get(name[0:2])
+            if gName is None: continue
+            if gName.endswith('_'): gName += name[2:]
+            if gName in ('POSITION', 'NORMAL'):
+                if not name.endswith('0'): continue
+                arr = arr[:, 0:3].astype(np.float32)
+                if gName == 'NORMAL':
+                    # glTF wants unit normals
+                    length = np.linalg.norm(arr, axis=1, keepdims=True)
+                    arr /= np.where(length > 0, length, 1)
+                res[gName] = self.addAccessor(arr, 'VEC3', 34962,
+                    bounds=(gName == 'POSITION'))
+            elif gName.startswith('TEXCOORD_'):
+                arr = normalizeArray(fvtx.attrsByName[name].format,
+                    arr[:, 0:2])
+                res[gName] = self.addAccessor(arr.astype(np.float32),
+                    'VEC2', 34962)
+            elif arr.shape[1] in (3, 4): # color
+                arr = normalizeArray(fvtx.attrsByName[name].format, arr)
+                arr = arr.astype(np.float32)
+                res[gName] = self.addAccessor(arr,
+                    'VEC%d' % arr.shape[1], 34962)
+        return res
+
+
+    def addModel(self, fmdl, allLods:bool=False):
+        """Add the shapes of a model, one node per shape and LOD."""
+        matBase = len(self.gltf['materials'])
+        for fmat in fmdl.fmats:
+            self.gltf['materials'].append({'name': fmat.name})
+
+        vtxAttrs = {}
+        for fshp in fmdl.fshps:
+            iVtx = fshp.header['fvtx_idx']
+            if iVtx not in vtxAttrs:
+                fvtx = fmdl.fvtxs[iVtx]
+                vtxAttrs[iVtx] = self.addVertexAttrs(fvtx, fvtx.vertices)
+
+            for i, lod in enumerate(_lods(fshp, allLods)):
+                prim = {
+                    'attributes': vtxAttrs[iVtx],
+                    'indices': self.addAccessor(
+                        lod.idx_buf.astype(np.uint32), 'SCALAR', 34963),
+                    'mode': gltfModes[lod.prim_fmt],
+                }
+                if fshp.header['fmat_idx'] < len(fmdl.fmats):
+                    prim['material'] = matBase + fshp.header['fmat_idx']
+                name = fshp.name if i == 0 else '%s.%d' % (fshp.name, i)
+                self.gltf['meshes'].append({'name': name,
+                    'primitives': [prim]})
+                self.gltf['nodes'].append({'name': name,
+                    'mesh': len(self.gltf['meshes']) - 1})
+                self.gltf['scenes'][0]['nodes'].append(
+                    len(self.gltf['nodes']) - 1)
+
+
+    def save(self, path:str):
+        """Write the .gltf file, and the .bin file next to it."""
+        self.gltf['buffers'] = [{'uri': self.binName,
+            'byteLength': len(self.data)}]
+        if not self.gltf['materials']: del self.gltf['materials']
+        with open(os.path.join(os.path.dirname(path), self.binName),
+        'wb') as file:
+            file.write(self.data)
+        with open(path, 'w') as file:
+            json.dump(self.gltf, file, indent=1)
+
+
+def writeGltf(path:str, fmdl, allLods:bool=False):
+    """Save the shapes of a model as glTF.
+
+    Only the geometry and material names are written; skinning and
+    rigid-body bone transforms are not.
+    """
+    base = os.path.splitext(os.path.basename(path))[0]
+    builder = GltfBuilder(base + '.bin')
+    builder.addModel(fmdl, allLods)
+    builder.save(path)
@@ -0,0 +1,93 @@
+import logging; log = logging.getLogger(__name__)
+import struct
+import zlib
+import numpy as np
+
+# DXGI format of each (texture format, data type); see BRTI.
+dxgiFormats = {
+    (0x02, 1):  61, # R8_UNORM
+    (0x09, 1):  49, # R8G8_UNORM
+    (0x0b, 1):  28, # R8G8B8A8_UNORM
+    (0x0b, 6):  29, # R8G8B8A8_UNORM_SRGB
+    (0x0c, 1):  87, # B8G8R8A8_UNORM
+    (0x0c, 6):  91, # B8G8R8A8_UNORM_SRGB
+    (0x0e, 1):  24, # R10G10B10A2_UNORM
+    (0x1a, 1):  71, # BC1_UNORM
+    (0x1a, 6):  72, # BC1_UNORM_SRGB
+    (0x1b, 1):  74, # BC2_UNORM
+    (0x1b, 6):  75, # BC2_UNORM_SRGB
+    (0x1c, 1):  77, # BC3_UNORM
+    (0x1c, 6):  78, # BC3_UNORM_SRGB
+    (0x1d, 1):  80, # BC4_UNORM
+    (0x1d, 2):  81, # BC4_SNORM
+    (0x1e, 1):  83, # BC5_UNORM
+    (0x1e, 2):  84, # BC5_SNORM
+    (0x1f, 5):  96, # BC6H_SF16
+    (0x1f, 10): 95, # BC6H_UF16
+    (0x20, 1):  98, # BC7_UNORM
+    (0x20, 6):  99, # BC7_UNORM_SRGB
+}
+
+
+def _pngChunk(typ:bytes, data:bytes) -> bytes:
+    return struct.pack('>I', len(data)) + typ + data + \
+        struct.pack('>I', zlib.crc32(typ + data))
+
+
+def encodePng(rgba:np.ndarray) -> bytes:
+    """Encode an image as PNG.
+
+    rgba: Array of shape (height, width, 4) and type uint8,
+        top row first.
+    """
+    height, width = rgba.shape[0:2]
+    # each row starts with its filter type (0 = none)
+    rows = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgba.reshape(height, width * 4)
+    return b''.join((
+        b'\x89PNG\r\n\x1a\n',
+        _pngChunk(b'IHDR', struct.pack('>IIBBBBB',
+            width, height, 8, 6, 0, 0, 0)), # 8-bit RGBA
+        _pngChunk(b'IDAT', zlib.compress(rows.tobytes(), 6)),
+        _pngChunk(b'IEND', b''),
+    ))
+
+
+def writePng(path:str, tex):
+    """Decode a BRTI and save it as PNG."""
+    pixels = tex.format_.decodePixels(tex.pixels)
+    pixels = np.asarray(pixels).reshape((tex.height, tex.width, 4))
+    rgba   = np.clip(np.rint(pixels * 255), 0, 255).astype(np.uint8)
+    with open(path, 'wb') as file:
+        file.write(encodePng(rgba))
+
+
+def encodeDds(tex) -> bytes:
+    """Encode the first mipmap of a BRTI as DDS, without decoding it.
+
+    Raises TypeError if the format has no DXGI equivalent.
+    """
+    key  = (tex.fmt_id, int(tex.header['fmt_dtype']))
+    dxgi = dxgiFormats.get(key)
+    if dxgi is None:
+        raise TypeError("Can't save %s (%s) as DDS" % (
+            type(tex.format_).__name__, tex.header['fmt_dtype'].name))
+
+    data  = bytes(tex.mipData)
+    flags = 0x1 | 0x2 | 0x4 | 0x1000 # caps, height, width, pixel format
+    if tex.blkWidth > 1: flags |= 0x80000 # linear size
+    else: flags |= 0x8 # pitch
+    pitch = len(data) if tex.blkWidth > 1 else tex.width * tex.bpp
+    pixelFormat = struct.pack('<II4s5I', 32, 0x4, b'DX10', 0, 0, 0, 0, 0)
+    header = struct.pack('<7I44x32sI4x4x4x4x',
+        124, flags, tex.height, tex.width, pitch, 0, 1,
+        pixelFormat, 0x1000) # caps: texture
+    dx10 = struct.pack('<5I', dxgi, 3, 0, 1, 0) # 2D, 1 array layer
+    return b'DDS ' + header + dx10 + data
+
+
+def writeDds(path:str, tex):
+    """Save a BRTI as DDS."""
+    data = encodeDds(tex)
+    with open(path, 'wb') as file:
+        file.write(data)
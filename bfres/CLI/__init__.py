@@ -0,0 +1,313 @@
+import logging; log = logging.getLogger(__name__)
+import argparse
+import os
+import os.path
+import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from ..BinaryStruct import VALIDATION_POLICIES
+from ..BinaryFile import MappedFile
+from ..Exceptions import UnsupportedFileTypeError
+from .. import YAZ0, ZSTD, FRES, BNTX
+from . import TextureWriter, MeshWriter
+
+# Command-line tool to inspect and extract BFRES and BNTX files
+# without Blender. Run it as `python -m bfres` from the directory
+# containing the `bfres` package.
+
+
+def loadFile(path:str, maxInMemory:int=None) -> MappedFile:
+    """Open a file, decompressing it if needed.
+
+    maxInMemory: Largest decompressed size to keep in memory, in
+        bytes; anything bigger goes through a temporary file.
+        None for no limit.
+    """
+    file = MappedFile(path)
+    while True:
+        magic = file.read(4, 0)
+        file.seek(0)
+        if magic in (b'Yaz0', b'Yaz1'):
+            decoder = YAZ0.Decoder(file)
+            if maxInMemory is None or decoder.size <= maxInMemory:
+                data = decoder.decompress()
+            else:
+                data = tempfile.TemporaryFile()
+                for block in decoder.blocks(): data.write(block)
+                data.seek(0)
+        elif magic == ZSTD.MAGIC:
+            if ZSTD.frameDictId(file) != 0:
+                dictPath = ZSTD.findDictionaryPack(file.name)
+                if dictPath is not None: ZSTD.loadDictionaryPack(dictPath)
+            data = ZSTD.decompressFile(file, maxInMemory)
+        else:
+            return file
+        file = MappedFile(data, name=file.name)
+
+
+def decodeFile(file:MappedFile, validation:str='strict',
+eagerStrings:bool=False):
+    """Decode a FRES or BNTX file.
+
+    Models are read lazily; see `FRES.decode()`.
+    Raises UnsupportedFileTypeError for other files.
+    """
+    magic = file.read(4, 0)
+    file.seek(0)
+    if magic == b'FRES':
+        obj = FRES.FRES(file, validation)
+        obj.decode(eagerStrings=eagerStrings, lazy=True)
+    elif magic == b'BNTX':
+        obj = BNTX.BNTX(file, validation)
+        obj.decode(eagerStrings=eagerStrings)
+    else:
+        raise UnsupportedFileTypeError(magic)
+    return obj
+
+
+def textureArchives(obj) -> list:
+    """Get the BNTXs in a decoded file: the file itself, or those
+    embedded in it.
+    """
+    if isinstance(obj, BNTX.BNTX): return [obj]
+    res = []
+    for embed in obj.embeds:
+        file = embed.toBinaryFile()
+        if file.read(4, 0) != b'BNTX': continue
+        file.seek(0)
+        bntx = BNTX.BNTX(file, obj.validation)
+        bntx.decode()
+        res.append(bntx)
+    return res
+
+
+def _safeName(name:str) -> str:
+    """Make a name from a file usable as a file name."""
+    return re.sub(r'[\x00-\x1F\\/:*?"<>|]', '_', str(name)) or '_'
+
+
+# extensions removed from an input file's name to name its output
+# directory; others, eg the '.Tex1' of 'Foo.Tex1.bfres.zs', are kept.
+_inputSuffixes = re.compile(r'(\.(zs|szs|yaz0|s?bfres|s?bntx))+$', re.I)
+
+def _outputName(path:str) -> str:
+    """Get the name of the directory to extract an input file's
+    contents to.
+    """
+    name = os.path.basename(path)
+    return _safeName(_inputSuffixes.sub('', name) or name)
+
+
+def _outputDir(opts, path:str) -> str:
+    """Get the directory to extract an input file's contents to."""
+    res  = os.path.join(opts.output, _outputName(path))
+    os.makedirs(res, exist_ok=True)
+    return res
+
+
+def cmdInfo(opts, path:str, obj) -> list:
+    """Summarize a file."""
+    res = []
+    if isinstance(obj, FRES.FRES):
+        res.append("%s: FRES '%s' v%d.%d, %d models, %d embedded files" % (
+            path, obj.name, *obj.version, len(obj.models),
+            len(obj.embeds)))
+        for fmdl in obj.models:
+            res.append("  model '%s': %d shapes, %d materials, %d vertex buffers, %d bones" % (
+                fmdl.name, len(fmdl.fshps), len(fmdl.fmats),
+                len(fmdl.fvtxs), len(fmdl.skeleton.bones)))
+            for fshp in fmdl.fshps:
+                fvtx = fmdl.fvtxs[fshp.header['fvtx_idx']]
+                res.append("    shape '%s': %d vertices, %s" % (
+                    fshp.name, fvtx.header['num_vtxs'],
+                    ', '.join('LOD %d: %d indices (%s)' % (
+                        i, lod.header['idx_cnt'], lod.prim_fmt)
+                        for i, lod in enumerate(fshp.lods))))
+    else:
+        res.append("%s: BNTX" % path)
+    for bntx in textureArchives(obj):
+        res.append("  texture pack '%s': %d textures" % (
+            bntx.name, len(bntx.textures)))
+        for tex in bntx.textures:
+            res.append("    texture '%s': %dx%d %s (%s), %d mipmaps" % (
+                tex.name, tex.width, tex.height,
+                type(tex.format_).__name__,
+                tex.header['fmt_dtype'].name,
+                tex.header['mipmap_cnt']))
+    return res
+
+
+def cmdDump(opts, path:str, obj) -> list:
+    """Dump a file's structures."""
+    res = ["%s:" % path, obj.dump()]
+    if isinstance(obj, FRES.FRES):
+        for bntx in textureArchives(obj):
+            res.append(bntx.dump())
+    return res
+
+
+def cmdExtractTextures(opts, path:str, obj) -> list:
+    """Save a file's textures as PNG or DDS."""
+    res = []
+    for bntx in textureArchives(obj):
+        outDir = os.path.join(_outputDir(opts, path), _safeName(bntx.name))
+        os.makedirs(outDir, exist_ok=True)
+        for tex in bntx.textures:
+            out = os.path.join(outDir,
+                '%s.%s' % (_safeName(tex.name), opts.format))
+            try:
+                if opts.format == 'dds': TextureWriter.writeDds(out, tex)
+                else: TextureWriter.writePng(out, tex)
+            except TypeError as ex: # unsupported format
+                log.warning("%s: texture '%s': %s", path, tex.name, ex)
+                continue
+            res.append(out)
+    return res
+
+
+def cmdExtractMeshes(opts, path:str, obj) -> list:
+    """Save a file's models as glTF or NumPy arrays."""
+    if not isinstance(obj, FRES.FRES): return []
+    res = []
+    outDir = _outputDir(opts, path)
+    for fmdl in obj.models:
+        out = os.path.join(outDir, '%s.%s' % (_safeName(fmdl.name),
+            'npz' if opts.format == 'npz' else 'gltf'))
+        if opts.format == 'npz':
+            MeshWriter.writeNpz(out, fmdl, opts.all_lods)
+        else: MeshWriter.writeGltf(out, fmdl, opts.all_lods)
+        res.append(out)
+    return res
+
+
+commands = {
+    'info':             cmdInfo,
+    'dump':             cmdDump,
+    'extract-textures': cmdExtractTextures,
+    'extract-meshes':   cmdExtractMeshes,
+}
+
+
+def processFile(opts, path:str) -> tuple:
+    """Run the command on one input file.
+
+    Returns (output lines, error message or None).
+    """
+    try:
+        file = loadFile(path, opts.max_in_memory_mb * 1024 * 1024)
+        obj  = decodeFile(file, opts.validation,
+            eagerStrings=(opts.command == 'dump'))
+        res  = commands[opts.command](opts, path, obj)
+        if opts.validation == 'deferred':
+            for issue in obj.validationReport():
+                res.append("  problem: %s" % issue)
+        return res, None
+    except Exception as ex:
+        log.debug("Failed processing %s", path, exc_info=True)
+        return [], "%s: %s: %s" % (path, type(ex).__name__, ex)
+
+
+def _initWorker(opts):
+    """Set up a worker process."""
+    _setup(opts)
+
+
+def _setup(opts):
+    """Set up logging and dictionaries."""
+    logging.basicConfig(format='%(levelname)s %(name)s: %(message)s',
+        level=(logging.WARNING, logging.INFO, logging.DEBUG)[
+            min(opts.verbose, 2)])
+    if opts.zs_dict:
+        ZSTD.loadDictionaryPack(opts.zs_dict)
+
+
+def makeParser() -> argparse.ArgumentParser:
+    """Build the command-line parser."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('files', nargs='+', metavar='FILE',
+        help="BFRES/BNTX files, optionally Yaz0 or zstd compressed")
+    common.add_argument('-j', '--jobs', type=int, default=0,
+        help="number of processes to use (default: one per CPU)")
+    common.add_argument('-v', '--verbose', action='count', default=0,
+        help="log more; repeat for debug messages")
+    common.add_argument('--validation', choices=VALIDATION_POLICIES,
+        default='strict',
+        help="how strictly to check file structures (default: strict)")
+    common.add_argument('--zs-dict', metavar='PATH',
+        help="ZsDic.pack.zs to decompress .zs files with "
+            "(default: look for one near each file)")
+    common.add_argument('--max-in-memory-mb', type=int, default=512,
+        help="decompress larger files through a temporary file")
+
+    parser = argparse.ArgumentParser(prog='python -m bfres',
+        description="Inspect and extract BFRES and BNTX files.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('info', parents=[common],
+        help="summarize models and textures")
+    sub.add_parser('dump', parents=[common],
+        help="dump all structures, for debugging")
+
+    cmd = sub.add_parser('extract-textures', parents=[common],
+        help="save textures as PNG or DDS")
+    cmd.add_argument('-o', '--output', default='.',
+        help="directory to extract to (default: current directory)")
+    cmd.add_argument('-f', '--format', choices=('png', 'dds'),
+        default='png', help="image format (default: png)")
+
+    cmd = sub.add_parser('extract-meshes', parents=[common],
+        help="save models as glTF or NumPy arrays")
+    cmd.add_argument('-o', '--output', default='.',
+        help="directory to extract to (default: current directory)")
+    cmd.add_argument('-f', '--format', choices=('gltf', 'npz'),
+        default='gltf',
+        help="gltf, or npz for raw vertex and index arrays (default: gltf)")
+    cmd.add_argument('--all-lods', action='store_true',
+        help="extract every LOD, not just the first")
+    return parser
+
+
+def main(args:list=None) -> int:
+    """Run the command-line tool.
+
+    Returns the exit status: 0 if every file was processed,
+    1 otherwise.
+    """
+    parser = makeParser()
+    opts   = parser.parse_args(args)
+    _setup(opts)
+
+    if hasattr(opts, 'output'):
+        # files that would extract to the same directory
+        outputs = {}
+        for path in opts.files:
+            other = outputs.setdefault(_outputName(path), path)
+            if os.path.abspath(other) != os.path.abspath(path):
+                parser.error("%s and %s would both be extracted to %s" % (
+                    other, path, os.path.join(opts.output,
+                        _outputName(path))))
+
+    jobs = min(opts.jobs or os.cpu_count() or 1, len(opts.files))
+    if jobs > 1:
+        pool    = ProcessPoolExecutor(jobs, initializer=_initWorker,
+            initargs=(opts,))
+        results = pool.map(processFile, [opts] * len(opts.files),
+            opts.files)
+    else:
+        pool    = None
+        results = (processFile(opts, path) for path in opts.files)
+
+    failed = 0
+    try:
+        for lines, error in results:
+            for line in lines: print(line)
+            if error is not None:
+                print(error, file=sys.stderr)
+                failed += 1
+    finally:
+        if pool is not None: pool.shutdown(cancel_futures=True)
+
+    if failed:
+        print("%d of %d files failed" % (failed, len(opts.files)),
+            file=sys.stderr)
+    return 1 if failed else 0
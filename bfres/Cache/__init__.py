@@ -0,0 +1,259 @@
+import logging; log = logging.getLogger(__name__)
+import hashlib
+import os
+import os.path
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+
+# On-disk cache of decoded data, so that importing a file again
+# doesn't need to decode it again.
+#
+# Each input file gets an entry, which is a directory named by the
+# hash of the (still compressed) file contents and the importer
+# version. An entry holds files (eg the decompressed data) and
+# named sets of arrays (eg a LOD's vertex attributes), stored as
+# .npz. Entries are evicted least recently used first once the
+# cache grows past its size limit, except those still in use.
+
+FORMAT = 1 # bump when the layout or meaning of cached data changes
+
+
+def defaultPath() -> str:
+    """Get the default cache directory for this platform."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or tempfile.gettempdir()
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or \
+            os.path.expanduser('~/.cache')
+    return os.path.join(base, 'bfres-importer')
+
+
+class CacheEntry:
+    """The cached data of one input file."""
+
+    def __init__(self, cache, key:str):
+        self.cache = cache
+        self.key   = key
+        self.path  = os.path.join(cache.path, key)
+        self.hits  = 0
+        self.misses = 0
+        self.isNew = True # whether nothing was cached yet
+        self._open = True
+
+
+    def close(self):
+        """Stop using this entry, so `Cache.trim()` may evict it."""
+        if self._open:
+            self._open = False
+            self.cache._release(self.key)
+
+
+    def _itemPath(self, name:str, ext:str) -> str:
+        # names are arbitrary (eg model and shape names), so hash them.
+        digest = hashlib.sha1(name.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, digest[:20] + ext)
+
+
+    def _write(self, path:str, write):
+        """Write a file atomically, so other imports never see part
+        of one.
+
+        write: Function to call with the open temporary file.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                write(file)
+            os.replace(tmp, path)
+        except BaseException:
+            try: os.unlink(tmp)
+            except OSError: pass
+            raise
+
+
+    def getFile(self, name:str) -> str:
+        """Get the path of a cached file, or None if not cached."""
+        path = self._itemPath(name, '.bin')
+        if os.path.isfile(path):
+            self.hits += 1
+            return path
+        self.misses += 1
+        return None
+
+
+    def putFile(self, name:str, data) -> str:
+        """Store a file in the cache.
+
+        data: A bytes-like object with the file contents.
+
+        Returns the path of the cached file, or None if it couldn't
+        be written.
+        """
+        path = self._itemPath(name, '.bin')
+        try: self._write(path, lambda file: file.write(data))
+        except OSError as ex:
+            log.warning("Can't write to cache %s: %s", self.path, ex)
+            return None
+        return path
+
+
+    def getArrays(self, name:str) -> dict:
+        """Get a set of cached arrays.
+
+        Returns a dict of array name => NumPy array, or None if not
+        cached.
+        """
+        path = self._itemPath(name, '.npz')
+        if not os.path.isfile(path):
+            self.misses += 1
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                res = {k: data[k] for k in data.files}
+        except (OSError, ValueError, EOFError) as ex:
+            log.warning("Ignoring damaged cache file %s: %s", path, ex)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return res
+
+
+    def putArrays(self, name:str, arrays:dict) -> bool:
+        """Store a set of arrays in the cache.
+
+        arrays: Dict of array name => NumPy array (or anything that
+            converts to one without needing pickle).
+
+        Returns whether they were stored.
+        """
+        path = self._itemPath(name, '.npz')
+        try: self._write(path, lambda file: np.savez(file, **arrays))
+        except (OSError, ValueError) as ex:
+            log.warning("Can't write %s to cache %s: %s", name, self.path, ex)
+            return False
+        return True
+
+
+class Cache:
+    """On-disk cache of decoded data."""
+
+    def __init__(self, path:str=None, maxSize:int=2048*1024*1024,
+    version:str=''):
+        """Create Cache.
+
+        path: Directory to keep the cache in. Default: `defaultPath()`.
+        maxSize: Size limit in bytes; see `trim()`.
+        version: Version of the code producing the cached data.
+            Data cached by other versions isn't used.
+        """
+        self.path    = path or defaultPath()
+        self.maxSize = maxSize
+        self.version = '%s/%d' % (version, FORMAT)
+        self._inUse  = {} # key => number of open CacheEntrys
+        self._lock   = threading.Lock() # imports run on several threads
+
+
+    def keyFor(self, data) -> str:
+        """Compute the cache key of an input file.
+
+        data: A bytes-like object with the file contents.
+        """
+        h = hashlib.sha256(self.version.encode('utf-8') + b'\0')
+        h.update(data)
+        return h.hexdigest()
+
+
+    def entry(self, data) -> CacheEntry:
+        """Get the cache entry of an input file, and mark it as
+        recently used.
+
+        data: A bytes-like object with the file contents.
+
+        The entry isn't evicted until it's closed.
+        """
+        entry = CacheEntry(self, self.keyFor(data))
+        with self._lock:
+            self._inUse[entry.key] = self._inUse.get(entry.key, 0) + 1
+        try:
+            os.makedirs(entry.path, exist_ok=True)
+            entry.isNew = not os.listdir(entry.path)
+            os.utime(entry.path)
+        except OSError as ex:
+            log.warning("Can't use cache %s: %s", self.path, ex)
+        return entry
+
+
+    def _release(self, key:str):
+        """Called when an entry is closed."""
+        with self._lock:
+            self._inUse[key] -= 1
+            if not self._inUse[key]: del self._inUse[key]
+
+
+    def _entries(self) -> list:
+        """List the entries in the cache.
+
+        Returns a list of (lastUsed, size, path), least recently
+        used first.
+        """
+        res = []
+        try: names = os.listdir(self.path)
+        except FileNotFoundError: return res
+        for name in names:
+            path = os.path.join(self.path, name)
+            try:
+                lastUsed = os.stat(path).st_mtime
+                size = 0
+                with os.scandir(path) as files:
+                    for file in files:
+                        if file.is_file(): size += file.stat().st_size
+            except (FileNotFoundError, NotADirectoryError):
+                continue # removed by another import, or not ours
+            res.append((lastUsed, size, path))
+        res.sort()
+        return res
+
+
+    def size(self) -> int:
+        """Get the total size of the cache in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+
+    def trim(self, maxSize:int=None) -> int:
+        """Evict least recently used entries until the cache is no
+        larger than `maxSize` bytes (default: `self.maxSize`).
+
+        Entries still open aren't evicted, since their files may be
+        in use (eg mapped).
+
+        Returns the number of bytes freed.
+        """
+        if maxSize is None: maxSize = self.maxSize
+        with self._lock: inUse = set(self._inUse)
+        entries = self._entries()
+        total   = sum(size for _, size, _ in entries)
+        freed   = 0
+        for lastUsed, size, path in entries:
+            if total <= maxSize: break
+            if os.path.basename(path) in inUse: continue
+            log.debug("Evicting cache entry %s (%d bytes, last used %s)",
+                path, size, time.ctime(lastUsed))
+            # files still mapped by this process can't be deleted
+            # on Windows; they'll go on a later trim.
+            shutil.rmtree(path, ignore_errors=True)
+            if not os.path.exists(path):
+                total -= size
+                freed += size
+        return freed
+
+
+    def clear(self):
+        """Remove everything in the cache."""
+        self.trim(0)
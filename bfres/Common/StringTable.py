@@ -4,6 +4,7 @@ from ..BinaryStruct.Padding import Padding
 from ..BinaryStruct.StringOffset import StringOffset
 from ..BinaryStruct.Switch import Offset32, Offset64, String
 from ..BinaryFile import BinaryFile
+import sys
 
 
 class Header(BinaryStruct):
@@ -18,11 +19,25 @@ class Header(BinaryStruct):
 
 
 class StringTable:
-    """A string table in an FRES."""
-    Header = Header
+    """A string table in an FRES or BNTX.
 
-    def __init__(self):
-        self.strings = {}
+    Once read, it also serves as the file's string pool: String
+    fields and `readStr()` look strings up here by offset instead of
+    reading and decoding them again. All strings are interned, so
+    names repeated across objects share one copy.
+
+    eager: Decode every string when the table is read. Otherwise,
+        strings are decoded when first looked up.
+    """
+    Header    = Header
+    encoding  = 'shift-jis' # how strings in the table are stored
+    lenprefix = '<H'
+
+    def __init__(self, eager:bool=False):
+        self.eager   = eager
+        self.strings = {} # offset of length prefix => str
+        self._other  = {} # (offset, nullTerminated) => str, outside table
+        self._allDecoded = False
 
 
     def readFromFile(self, file, offset=None):
@@ -31,20 +46,88 @@ class StringTable:
         #log.debug("Read str table from 0x%X", offset)
         header = self.Header()
         self.header = header.readFromFile(file, offset)
-        offset += header.size
+        self.file   = file
+
+        # bounds of the string data
+        self.start = offset + header.size
+        self.end   = file.size
+        if self.header['size'] > header.size:
+            self.end = min(self.end, offset + self.header['size'])
+
+        if self.eager: self.decodeAll()
+        return self
 
+
+    def decodeAll(self) -> dict:
+        """Decode every string in the table.
+
+        Returns the `strings` dict.
+        """
+        if self._allDecoded: return self.strings
+        offset = self.start
         for i in range(self.header['num_strs']):
             offset += (offset & 1) # pad to u16
-            length = file.read('<H',   offset)
-            data   = file.read(length, offset+2)
-            try:
-                data = data.decode('shift-jis')
-            except UnicodeDecodeError:
-                log.error("Can't decode string from 0x%X as 'shift-jis': %s",
-                    offset, data[0:16])
-                raise
-            self.strings[offset] = data
-            #print('StrTab[%06X]: "%s"' % (offset, data))
+            if offset not in self.strings:
+                self._decodeAt(offset, strict=True)
+            #print('StrTab[%06X]: "%s"' % (offset, self.strings[offset]))
+            length  = self.file.read('<H', offset)
             offset += length + 3 # +2 for length, 1 for null terminator
+        self._allDecoded = True
+        return self.strings
 
-        return self
+
+    def _decodeAt(self, offset:int, strict:bool=False):
+        """Decode and cache the string whose length prefix is at
+        `offset`.
+
+        strict: Raise on errors, instead of returning None.
+        """
+        file   = self.file
+        length = file.read('<H',   offset)
+        if not strict and offset + 2 + length > self.end:
+            return None # runs past the table; not really an entry
+        data   = file.read(length, offset+2)
+        try:
+            data = data.decode(self.encoding)
+        except UnicodeDecodeError:
+            if not strict: return None
+            log.error("Can't decode string from 0x%X as 'shift-jis': %s",
+                offset, data[0:16])
+            raise
+        data = sys.intern(data)
+        self.strings[offset] = data
+        return data
+
+
+    def dump(self) -> str:
+        """Dump to string for debug."""
+        return '\n'.join('StrTab[%06X]: "%s"' % (offs, s)
+            for offs, s in sorted(self.decodeAll().items()))
+
+
+    def get(self, offset:int, nullTerminated:bool=False):
+        """Look up a string.
+
+        offset: Offset of the string's length prefix; or, if
+            `nullTerminated`, of its first character.
+
+        Returns the string, or None if it hasn't been seen.
+        """
+        key = offset - 2 if nullTerminated else offset
+        s   = self.strings.get(key)
+        if s is None and not self._allDecoded \
+        and self.start <= key and key + 2 <= self.end:
+            s = self._decodeAt(key)
+        if s is not None and not (nullTerminated and '\0' in s):
+            return s
+        return self._other.get((offset, nullTerminated))
+
+
+    def add(self, offset:int, s:str, nullTerminated:bool=False) -> str:
+        """Remember a string read from outside the table.
+
+        Returns the interned string.
+        """
+        s = sys.intern(s)
+        self._other[(offset, nullTerminated)] = s
+        return s
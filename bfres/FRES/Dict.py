@@ -34,17 +34,122 @@ class Node(BinaryStruct):
         self.right_idx    = data['right_idx']
         self.name         = data['name']
         self.data_offset  = data['data_offset']
-        self.left         = None
-        self.right        = None
+        self.dict         = None # set by Dict
+        self.index        = None # position in the Dict, set by Dict
         return self
 
 
+    @property
+    def ref(self) -> int:
+        """The bit this node tests: (char index << 3) | bit index.
+        -1 for the root node.
+        """
+        ref = self.search_value
+        return ref - 0x100000000 if ref & 0x80000000 else ref
+
+
+    @property
+    def left(self):
+        return self.dict.node(self.left_idx)
+
+
+    @property
+    def right(self):
+        return self.dict.node(self.right_idx)
+
+
 class Dict(FresObject):
-    """A name dict in an FRES."""
+    """A name dict in an FRES.
+
+    The dict is a Patricia trie: each node tests one bit of the name
+    and links to the nodes for 0 (left) and 1 (right). `find()` walks
+    it, reading only the nodes it passes through.
+    """
 
     def __init__(self, fres):
-        self.fres  = fres
-        self.nodes = []
+        self.fres   = fres
+        self._nodes = []
+        self._index = None # name => node index, see buildIndex()
+
+
+    @property
+    def nodes(self) -> list:
+        """All nodes, including the root at index 0."""
+        for i, node in enumerate(self._nodes):
+            if node is None: self.node(i)
+        return self._nodes
+
+
+    def node(self, idx:int):
+        """Get node by index, reading it if needed.
+
+        Returns None if the index is out of range.
+        """
+        try: node = self._nodes[idx]
+        except IndexError: return None
+        if node is None:
+            node = Node().readFromFile(self.fres.file,
+                self.offset + (idx * Node.size))
+            node.dict  = self
+            node.index = idx
+            self._nodes[idx] = node
+        return node
+
+
+    def find(self, name:str):
+        """Look up a node by name.
+
+        Returns the Node, or None if not found.
+        """
+        if self._index is not None:
+            idx = self._index.get(name)
+            return None if idx is None else self.node(idx)
+        if len(self._nodes) < 2: return None
+
+        try: key = name.encode(self.fres.file.stringPool.encoding)
+        except AttributeError: key = name.encode('shift-jis')
+        keyLen = len(key)
+        prev = self.root
+        cur  = prev.left
+        while cur is not None and prev.ref < cur.ref:
+            prev = cur
+            ref  = cur.ref
+            char = ref >> 3
+            bit  = (key[keyLen-1-char] >> (ref & 7)) & 1 \
+                if char < keyLen else 0
+            cur  = cur.right if bit else cur.left
+        if cur is None or cur is self.root or cur.name != name:
+            return None
+        return cur
+
+
+    def indexOf(self, name:str) -> int:
+        """Get the item index of a name, ie the index of the object
+        it refers to (not counting the root node).
+
+        Raises KeyError if not found.
+        """
+        if self._index is not None:
+            return self._index[name] - 1
+        node = self.find(name)
+        if node is None: raise KeyError(name)
+        return node.index - 1
+
+
+    def __contains__(self, name:str) -> bool:
+        return self.find(name) is not None
+
+
+    def buildIndex(self):
+        """Read every node and index them by name.
+
+        Worth doing if many lookups will be made; `find()` then uses
+        the index instead of walking the trie.
+        Returns self.
+        """
+        self._index = {node.name: i
+            for i, node in enumerate(self.nodes) if i > 0}
+        return self
 
 
     def dump(self):
@@ -64,7 +169,11 @@ class Dict(FresObject):
 
 
     def readFromFRES(self, offset):
-        """Read this object from the FRES."""
+        """Read this object from the FRES.
+
+        Only the header and root node are read here; the others are
+        read when first needed.
+        """
         self.header = Header().readFromFile(self.fres.file, offset)
 
         #log.debug("Dict @ 0x%06X: unk00=0x%08X num_items=%d",
@@ -72,24 +181,10 @@ class Dict(FresObject):
         #    self.header['unk00'],
         #    self.header['num_items'],
         #)
-        offset += Header.size
-
-        # read nodes (+1 for root node)
-        for i in range(self.header['num_items'] + 1):
-            node = Node().readFromFile(self.fres.file, offset)
-            self.nodes.append(node)
-            #log.debug('Node %3d: S=0x%08X I=0x%04X,0x%04X D=0x%06X "%s"',
-            #    i, node.search_value, node.left_idx,
-            #    node.right_idx, node.data_offset, node.name,
-            #)
-            offset += Node.size
-
-        # build tree
-        self.root = self.nodes[0]
-        for i, node in enumerate(self.nodes):
-            try: node.left  = self.nodes[node.left_idx]
-            except IndexError: node.left = None
-            try: node.right = self.nodes[node.right_idx]
-            except IndexError: node.right = None
+        self.offset = offset + Header.size
 
+        # +1 for root node
+        self._nodes = [None] * (self.header['num_items'] + 1)
+        self._index = None
+        self.root   = self.node(0)
         return self
@@ -3,7 +3,7 @@ from ..BinaryStruct import BinaryStruct, BinaryObject
 from ..BinaryStruct.Padding import Padding
 from ..BinaryStruct.StringOffset import StringOffset
 from ..BinaryStruct.Switch import Offset32, Offset64, String
-from ..BinaryFile import BinaryFile
+from ..BinaryFile import BinaryFile, MappedFile
 from .FresObject import FresObject
 import tempfile
 
@@ -49,11 +49,16 @@ class EmbeddedFile(FresObject):
         self.header = self.fres.read(Header(), offset)
         self.dataOffset = self.header['data_offset']
         self.size = self.header['size']
-        self.data = self.fres.read(self.size, self.dataOffset)
+        self.data = self.fres.view(self.size, self.dataOffset)
 
         return self
 
 
+    def toBinaryFile(self) -> BinaryFile:
+        """Wrap the data in a BinaryFile without copying it."""
+        return MappedFile(self.data, name=self.name)
+
+
     def toTempFile(self) -> BinaryFile:
         """Dump to a temporary file."""
         if self._tempFile is None:
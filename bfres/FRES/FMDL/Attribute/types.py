@@ -1,4 +1,12 @@
 import logging; log = logging.getLogger(__name__)
+import numpy as np
+
+# Formats that need converting have a scalar conversion function
+# (`func`), which takes the values of one vertex. Each has an array
+# version (see `arrayFuncs`), which takes the values of every vertex
+# as an array of shape (vertices, components) and converts them all
+# at once. The scalar versions are the reference for the array
+# versions.
 
 def unpack10bit(val):
     if type(val) in (list, tuple):
@@ -21,7 +29,7 @@ def unpackArmHalfFloat(val):
     """
     if type(val) in (list, tuple):
         return list(map(unpackArmHalfFloat, val))
-    frac = (val & 0x3FF) / 0x3FF
+    frac = (val & 0x3FF) / 0x400
     exp  = (val >> 10) & 0x1F
     sign = -1 if (val & 0x8000) else 1
     if exp == 0:
@@ -30,6 +38,61 @@ def unpackArmHalfFloat(val):
         return sign * (2 ** (exp-15)) * (1+frac)
 
 
+def unpack10bitArray(vals:np.ndarray) -> np.ndarray:
+    """Array version of `unpack10bit()`."""
+    vals = vals.reshape(len(vals)).astype(np.uint32)
+    res  = np.empty((len(vals), 4), dtype=np.float32)
+    for i in range(3):
+        v = ((vals >> (i*10)) & 0x3FF).astype(np.int32)
+        v = np.where(v & 0x200, v - 1024, v) # sign extend
+        res[:, i] = np.maximum(v, -511) / 511
+    res[:, 3] = vals >> 30
+    return res
+
+
+def unpackArmHalfFloatArray(vals:np.ndarray) -> np.ndarray:
+    """Array version of `unpackArmHalfFloat()`."""
+    vals = np.ascontiguousarray(vals, dtype=np.uint16)
+    res  = vals.view(np.float16).astype(np.float32)
+    # what would be Inf/NaN in IEEE format is just the next
+    # exponent up in ARM format.
+    big = (vals & 0x7C00) == 0x7C00
+    if big.any():
+        res[big] = (vals[big] - 0x0400).view(np.float16) \
+            .astype(np.float32) * 2
+    return res
+
+
+# array version of each format's `func`
+arrayFuncs = {
+    unpack10bit:        unpack10bitArray,
+    unpackArmHalfFloat: unpackArmHalfFloatArray,
+}
+
+
+def getArrayFunc(fmt:dict):
+    """Get the function converting an array of values in the given
+    format (from `attrFmts`), or None if they need no conversion.
+    """
+    if 'func' not in fmt: return None
+    return arrayFuncs[fmt['func']]
+
+
+def normalizeArray(fmt:dict, vals:np.ndarray) -> np.ndarray:
+    """Scale integer values to 0..1 (unsigned) or -1..1 (signed)
+    using the format's `min` and `max`.
+
+    fmt: The format, from `attrFmts`.
+    vals: The values, eg from `FVTX.vertices`.
+
+    Other values are returned as they are.
+    """
+    if vals.dtype.kind not in 'iu' or 'max' not in fmt: return vals
+    res = vals / fmt['max']
+    if fmt['min'] < 0: res = np.maximum(res, -1)
+    return res.astype(np.float32)
+
+
 
 typeRanges = { # name: (min, max)
     'b': (       -128,        127),
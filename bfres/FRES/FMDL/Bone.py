@@ -16,7 +16,11 @@ from .Vertex    import Vertex
 import struct
 from enum import IntEnum
 import math
-import mathutils # Blender
+try: import mathutils # Blender
+except ImportError:
+    # reading works without Blender (eg in worker processes);
+    # computeTransform() doesn't.
+    mathutils = None
 
 
 class BoneStruct(BinaryStruct):
@@ -135,8 +139,7 @@ class Bone(FresObject):
         res.append("Position: %#5.2f, %#5.2f, %#5.2f" % tuple(self.pos))
         res.append("Rotation: %#5.2f, %#5.2f, %#5.2f, %#5.2f" % tuple(self.rot) + rotD)
         res.append("Scale:    %#5.2f, %#5.2f, %#5.2f" % tuple(self.scale))
-        res.append("Unk04: 0x%08X 0x%08X 0x%08X 0x%08X 0x%08X" %
-            self.unk04)
+        res.append("Unknown:  %s" % ' '.join('0x%08X' % v for v in self.unk))
         res.append("Parent     Idx: %3d" % self.parent_idx)
         res.append("Smooth Mtx Idx: %3d" % self.smooth_mtx_idx)
         res.append("Rigid  Mtx Idx: %3d" % self.rigid_mtx_idx)
@@ -155,8 +158,10 @@ class Bone(FresObject):
         self.offset = offset
         if self.fres.header['version'] == (0, 10):
             data = self.fres.read(BoneStruct10(), offset)
+            self.unk = data['unk08']
         else:
             data = self.fres.read(BoneStruct(), offset)
+            self.unk = data['unk04']
 
         self.name           = data['name']
         self.pos            = data['pos']
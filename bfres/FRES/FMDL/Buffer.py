@@ -15,7 +15,7 @@ class Buffer:
         self.size   = size
         self.stride = stride
         self.offset = offset
-        self.data   = file.read(size, offset)
+        self.data   = file.view(size, offset)
         if len(self.data) < size:
             log.error("Buffer size is 0x%X but only read 0x%X",
                 size, len(self.data))
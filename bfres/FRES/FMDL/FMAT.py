@@ -276,6 +276,30 @@ class FMAT(FresObject):
         return self
 
 
+    def toDict(self) -> dict:
+        """Return the decoded material as plain dicts and lists,
+        which are cheap to send to another process.
+
+        The Dicts it was read through are left out. See `fromDict()`.
+        """
+        res = {name: getattr(self, name) for name in (
+            'name', 'headerOffset', 'vtxAttrs', 'renderInfo',
+            'materialParams', 'textureSamplers', 'fragSamplers',
+            'shaderOptions')}
+        res['header']          = dict(self.header.items())
+        res['shader_assign']   = dict(self.shader_assign.items())
+        res['samplerInfoList'] = [{'slot': smp['slot'],
+            'data': dict(smp['data'].items())}
+            for smp in self.samplerInfoList]
+        return res
+
+
+    def fromDict(self, data:dict):
+        """Use a material decoded elsewhere by `toDict()`."""
+        for name, val in data.items(): setattr(self, name, val)
+        return self
+
+
     def _readDicts(self):
         """Read the dicts."""
         dicts = ('render_info', 'sampler', 'mat_param', 'user_data')
@@ -90,8 +90,8 @@ class FSHP(FresObject):
 
     def __init__(self, fres):
         self.fres         = fres
-        self.fvtx         = None
-        self.lods         = None
+        self.fmdl         = None # set by the FMDL
+        self._lods        = None # read on first access
         self.header       = None
         self.headerOffset = None
         self.skinidx      = None
@@ -118,8 +118,12 @@ class FSHP(FresObject):
         return res
 
 
-    def readFromFRES(self, offset=None):
-        """Read this object from given file."""
+    def readFromFRES(self, offset=None, lazy:bool=False):
+        """Read this object from given file.
+
+        lazy: Only read the header. The LODs are then read when
+            first accessed.
+        """
         if offset is None: offset = self.fres.file.tell()
         log.debug("Reading FSHP from 0x%06X", offset)
         self.headerOffset = offset
@@ -128,17 +132,41 @@ class FSHP(FresObject):
         else:
             self.header = self.fres.read(Header(), offset)
         self.name   = self.header['name']
+        if not lazy: self.decodeAll()
+        return self
+
+
+    def decodeAll(self):
+        """Read everything that hasn't been read yet."""
+        self.lods
+        return self
+
 
-        # read FVTX
-        self.fvtx = FVTX(self.fres).readFromFRES(
-            self.header['fvtx_offset'])
+    @property
+    def fvtx(self):
+        """The FVTX this shape uses, from the model's `fvtxs`."""
+        if self.fmdl is None or self.header is None: return None
+        return self.fmdl.fvtxs[self.header['fvtx_idx']]
 
-        # read LODs
-        self.lods = []
+
+    @property
+    def lods(self) -> list:
+        """The LOD meshes."""
+        if self._lods is None and self.header is not None:
+            self.readLods()
+        return self._lods
+
+
+    def readLods(self, idxBufs:list=None):
+        """Read the LOD meshes.
+
+        idxBufs: Their index buffers, if already decoded.
+        """
+        self._lods = []
         offs = self.header['lod_offset']
         for i in range(self.header['lod_cnt']):
-            model = LOD(self.fres).readFromFRES(offs)
-            offs += LOD.Header.size
-            self.lods.append(model)
-
-        return self
+            idxBuf = None if idxBufs is None else idxBufs[i]
+            model  = LOD(self.fres).readFromFRES(offs, idxBuf)
+            offs  += LOD.Header.size
+            self._lods.append(model)
+        return self._lods
@@ -9,7 +9,7 @@ from ...FRES.FresObject import FresObject
 from ...FRES.Dict import Dict
 from .Bone import Bone
 import struct
-import math
+import numpy as np
 
 
 class Header(BinaryStruct):
@@ -143,37 +143,33 @@ class FSKL(FresObject):
 
     def _readSmoothIdxs(self):
         """Read smooth matrix indices."""
-        self.smooth_idxs = self.fres.read('h',
+        self.smooth_idxs = self.fres.readArray('h',
             pos   = self.header['smooth_idx_offs'],
             count = self.header['num_smooth_idxs'])
 
 
     def _readSmoothMtxs(self):
         """Read smooth matrices."""
-        self.smooth_mtxs = []
+        self.smooth_mtxs = np.zeros((0, 4, 3), dtype=np.float32)
         if len(self.smooth_idxs) == 0:
             log.info("no smooth idxs")
             return
 
-        for i in range(max(self.smooth_idxs)):
-            # read the matrix
-            mtx = self.fres.read('3f', count = 4,
-                pos = self.header['smooth_mtx_offs'] + (i*16*3))
-
-            # warn about invalid values
-            for y in range(4):
-                for x in range(3):
-                    n = mtx[y][x]
-                    if math.isnan(n) or math.isinf(n):
-                        log.warning("Skeleton smooth mtx %d element [%d,%d] is %s",
-                            i, x, y, n)
-
-            # replace all invalid values with zeros
-            flt = lambda e: \
-                0 if (math.isnan(e) or math.isinf(e)) else e
-            mtx = list(map(lambda row: list(map(flt, row)), mtx))
-
-            self.smooth_mtxs.append(mtx)
+        # one matrix per smooth bone, each 4 rows of 3 floats.
+        count = self.header['num_smooth_idxs']
+        mtxs  = self.fres.readArray('12f',
+            pos   = self.header['smooth_mtx_offs'],
+            count = count).reshape(count, 4, 3)
+
+        # warn about invalid values
+        bad = ~np.isfinite(mtxs)
+        if bad.any():
+            for i, y, x in np.argwhere(bad):
+                log.warning("Skeleton smooth mtx %d element [%d,%d] is %s",
+                    i, x, y, mtxs[i, y, x])
+
+        # replace all invalid values with zeros
+        self.smooth_mtxs = np.where(bad, np.float32(0), mtxs)
 
 
     def _readBones(self):
@@ -3,15 +3,16 @@ from ...BinaryStruct import BinaryStruct, BinaryObject
 from ...BinaryStruct.Padding import Padding
 from ...BinaryStruct.StringOffset import StringOffset
 from ...BinaryStruct.Switch import Offset32, Offset64, String
-from ...BinaryFile import BinaryFile
+from ...BinaryFile import BinaryFile, arrayType
 from ...FRES.FresObject import FresObject
 from ...FRES.Dict import Dict
 from ...Exceptions import MalformedFileError
 from .Attribute import Attribute, AttrStruct
+from .Attribute.types import getArrayFunc
 from .Buffer import Buffer
-from .Vertex import Vertex
+from .VertexStore import VertexStore
+import numpy as np
 import struct
-import math
 
 
 class BufferStrideStruct(BinaryStruct):
@@ -97,6 +98,7 @@ class FVTX(FresObject):
         self.attrs        = []
         self.buffers      = []
         self.vtx_attrib_dict = None
+        self._vertices    = None # read on first access
 
 
     def __str__(self):
@@ -151,8 +153,12 @@ class FVTX(FresObject):
         return '\n'.join(res).replace('\n', '\n  ')
 
 
-    def readFromFRES(self, offset=None):
-        """Read this object from given file."""
+    def readFromFRES(self, offset=None, lazy:bool=False):
+        """Read this object from given file.
+
+        lazy: Don't decode the vertices until `vertices` is first
+            accessed.
+        """
         if offset is None: offset = self.fres.file.tell()
         log.debug("Reading FVTX from 0x%06X", offset)
         self.headerOffset = offset
@@ -165,13 +171,50 @@ class FVTX(FresObject):
             self._readDicts()
             self._readAttrs()
             self._readBuffers()
-            self._readVtxs()
+            if not lazy: self.decodeAll()
         except struct.error:
             log.exception("Error reading FVTX")
             raise
         return self
 
 
+    def decodeAll(self):
+        """Read everything that hasn't been read yet."""
+        self.vertices
+        return self
+
+
+    @property
+    def vertices(self) -> VertexStore:
+        """The decoded vertices.
+
+        Acts as a dict of attribute name (eg '_p0') => NumPy array of
+        shape (num_vtxs, components). Attributes in unknown formats
+        are left out.
+        """
+        if self._vertices is None and self.header is not None:
+            self._vertices = self._readVertices()
+        return self._vertices
+
+
+    def setVertices(self, arrays:dict):
+        """Use vertices decoded elsewhere.
+
+        arrays: Attribute name => array, as in `vertices`.
+        """
+        self._vertices = VertexStore(self.header['num_vtxs'], arrays)
+
+
+    @property
+    def vtxs(self):
+        """The decoded vertices, as Vertex objects made on access.
+
+        Much slower than `vertices`; for debugging.
+        """
+        if self.vertices is None: return None
+        return self.vertices.vtxs
+
+
     def _readDicts(self):
         """Read the dicts belonging to this FVTX."""
         self.vtx_attrib_dict = Dict(self.fres)
@@ -227,49 +270,79 @@ class FVTX(FresObject):
 
 
 
-    def _readVtxs(self):
-        """Read the vertices from the buffers."""
-        self.vtxs = []
-        for iVtx in range(self.header['num_vtxs']):
-            vtx = Vertex()
-            for attr in self.attrs: # get the data for each attribute
-                if attr.buf_idx >= len(self.buffers) or attr.buf_idx < 0:
-                    log.error("Attribute '%s' uses buffer %d, but max index is %d",
-                        attr.name, attr.buf_idx, len(self.buffers)-1)
-                    raise MalformedFileError("Invalid buffer index for attribute "+attr.name)
-                buf  = self.buffers[attr.buf_idx]
-                offs = attr.buf_offs + (iVtx * buf.stride)
-                fmt  = attr.format
-                #log.debug("Read attr '%s' from buffer %d, offset 0x%X, stride 0x%X, fmt %s",
-                #    attr.name, attr.buf_idx, attr.buf_offs,
-                #    buf.stride, fmt['name'])
-
-                # get the conversion function if any
-                func = None
-                if type(fmt) is dict:
-                    func = fmt.get('func', None)
-                    fmt  = fmt['fmt']
-
-                # get the data
-                try:
-                    data = struct.unpack_from(fmt, buf.data, offs)
-                except struct.error:
-                    log.error("Attribute '%s' reading out of bounds from buffer %d (vtx %d of %d = offset 0x%X fmt '%s', max = 0x%X)",
-                        attr.name, attr.buf_idx, iVtx,
-                        self.header['num_vtxs'], offs, fmt,
-                        len(buf.data))
-                    raise MalformedFileError("Invalid buffer offset for attribute "+attr.name)
-                if func: data = func(data)
-
-                # validate
-                d = data
-                if type(d) not in (list, tuple): d = [d]
-                for v in d:
-                    if math.isinf(v) or math.isnan(v):
-                        log.warning("%s value in attribute %s vtx %d (offset 0x%X buffer %d base 0x%X)",
-                            str(v), attr.name, iVtx, offs,
-                            attr.buf_idx, attr.buf_offs)
-
-                vtx.setAttr(attr, data)
-
-            self.vtxs.append(vtx)
+    def _bufferDtype(self, attrs:list) -> np.dtype:
+        """Build the structured dtype of one vertex in a buffer.
+
+        attrs: The attributes stored in the buffer.
+        """
+        names, formats, offsets = [], [], []
+        for attr in attrs:
+            dtype, count = self._attrType(attr)
+            names.append(attr.name)
+            formats.append((dtype, (count,)))
+            offsets.append(attr.buf_offs)
+        return np.dtype({'names': names, 'formats': formats,
+            'offsets': offsets})
+
+
+    def _attrType(self, attr):
+        """Get the NumPy dtype and values per vertex of an attribute.
+
+        Returns (dtype, count), or (None, 0) if its format can't be
+        read as an array (see `arrayType()`).
+        """
+        fmt = attr.format['fmt']
+        if fmt[0] not in '<>!=@': fmt = '<' + fmt # vertex data is LE
+        return arrayType(fmt)
+
+
+    def _readVertices(self) -> VertexStore:
+        """Decode the attributes of all vertices, a buffer at a time."""
+        nVtx   = self.header['num_vtxs']
+        byBuf  = {}
+        for attr in self.attrs:
+            if attr.buf_idx >= len(self.buffers) or attr.buf_idx < 0:
+                log.error("Attribute '%s' uses buffer %d, but max index is %d",
+                    attr.name, attr.buf_idx, len(self.buffers)-1)
+                raise MalformedFileError("Invalid buffer index for attribute "+attr.name)
+            if attr.format is None: continue # already warned about
+            if self._attrType(attr)[0] is None:
+                log.warning("Attribute '%s' has format '%s', which can't be read as an array; skipping it",
+                    attr.name, attr.format['fmt'])
+                continue
+            byBuf.setdefault(attr.buf_idx, []).append(attr)
+
+        res = VertexStore(nVtx)
+        for iBuf, attrs in byBuf.items():
+            buf   = self.buffers[iBuf]
+            dtype = self._bufferDtype(attrs)
+            try:
+                # a view of the interleaved vertices, without copying
+                vtxs = np.ndarray((nVtx,), dtype, buffer=buf.data,
+                    strides=(buf.stride,))
+            except (TypeError, ValueError):
+                log.error("Attributes %s reading out of bounds from buffer %d (%d vtxs, stride 0x%X, vertex size 0x%X, max = 0x%X)",
+                    ', '.join(attr.name for attr in attrs), iBuf, nVtx,
+                    buf.stride, dtype.itemsize, len(buf.data))
+                raise MalformedFileError("Invalid buffer offset for attribute "+attrs[0].name)
+
+            for attr in attrs:
+                # copy, so the arrays are contiguous and don't keep
+                # the file open.
+                arr  = np.array(vtxs[attr.name])
+                func = getArrayFunc(attr.format)
+                if func: arr = func(arr)
+                self._validateAttr(attr, arr)
+                res.add(attr.name, arr)
+        return res
+
+
+    def _validateAttr(self, attr, arr:np.ndarray):
+        """Warn about Inf and NaN values in a decoded attribute."""
+        if arr.dtype.kind != 'f': return
+        bad = ~np.isfinite(arr.reshape(len(arr), -1)).all(axis=1)
+        if bad.any():
+            log.warning("%d vertices with Inf/NaN values in attribute %s (first is vtx %d; buffer %d base 0x%X)",
+                np.count_nonzero(bad), attr.name, np.argmax(bad),
+                attr.buf_idx, attr.buf_offs)
+
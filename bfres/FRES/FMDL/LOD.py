@@ -8,6 +8,7 @@ from ...FRES.FresObject import FresObject
 from ...FRES.Dict import Dict
 from ...Exceptions import MalformedFileError
 import struct
+import numpy as np
 
 
 primTypes = {
@@ -116,8 +117,11 @@ class LOD(FresObject):
         )
 
 
-    def readFromFRES(self, offset=None):
-        """Read this object from given file."""
+    def readFromFRES(self, offset=None, idxBuf=None):
+        """Read this object from given file.
+
+        idxBuf: The index buffer, if already decoded.
+        """
         if offset is None: offset = self.fres.file.tell()
         log.debug("Reading LOD  from 0x%06X", offset)
         self.headerOffset = offset
@@ -138,7 +142,8 @@ class LOD(FresObject):
             raise MalformedFileError("Unknown index type 0x%X" %
                 self.header['idx_type'])
 
-        self._readIdxBuf()
+        if idxBuf is None: self._readIdxBuf()
+        else: self.idx_buf = idxBuf
         self._readSubmeshes()
 
         return self
@@ -147,12 +152,13 @@ class LOD(FresObject):
     def _readIdxBuf(self):
         """Read the index buffer."""
         base  = self.fres.bufferSection['buf_offs']
-        self.idx_buf = self.fres.read(self.idx_fmt,
+        idxs  = self.fres.readArray(self.idx_fmt,
             pos   = self.header['face_offs'] + base,
             count = self.header['idx_cnt'])
 
-        for i in range(self.header['idx_cnt']):
-            self.idx_buf[i] += self.header['visibility_group']
+        # also converts big-endian indices to native order
+        self.idx_buf = idxs.astype(np.uint32) + \
+            np.uint32(self.header['visibility_group'])
 
 
     def _readSubmeshes(self):
@@ -51,16 +51,16 @@ class Vertex:
         self.extra    = {} # extra attributes
 
 
-    def setAttr(self, attr, val):
-        if   attr.name == '_p0': self.pos.set(*val)
-        elif attr.name == '_n0': self.normal.set(*val)
-        elif attr.name == '_u0': self.texcoord.set(*val) # XXX cast ints
+    def setAttr(self, name, val):
+        if   name == '_p0': self.pos.set(*val)
+        elif name == '_n0': self.normal.set(*val)
+        elif name == '_u0': self.texcoord.set(*val) # XXX cast ints
 
-        elif attr.name == '_i0':
+        elif name == '_i0':
             for i, d in enumerate(val):
                 self.idx[i] = d
 
-        elif attr.name == '_w0':
+        elif name == '_w0':
             for i, d in enumerate(val):
                 self.weight[i] = d # XXX cast ints
 
@@ -68,8 +68,8 @@ class Vertex:
         # XXX _u1 (u16 x2)
 
         else:
-            #log.warn("Unknown attribute '%s'", attr.name)
-            self.extra[attr.name] = val
+            #log.warn("Unknown attribute '%s'", name)
+            self.extra[name] = val
 
 
     def __str__(self):
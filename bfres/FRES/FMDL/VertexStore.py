@@ -0,0 +1,89 @@
+import logging; log = logging.getLogger(__name__)
+from collections.abc import Mapping, Sequence
+import numpy as np
+from .Vertex import Vertex
+
+
+class VertexStore(Mapping):
+    """The decoded vertices of an FVTX, one array per attribute.
+
+    Acts as a dict of attribute name (eg '_p0') => NumPy array of
+    shape (count, components). `vertex()` and `vtxs` make Vertex
+    objects on request, for debugging.
+    """
+
+    def __init__(self, count:int, arrays:dict=None):
+        """Create VertexStore.
+
+        count: Number of vertices.
+        arrays: Attribute name => array of values, one row per vertex.
+        """
+        self.count   = count
+        self._arrays = {}
+        for name, arr in (arrays or {}).items():
+            self.add(name, arr)
+
+
+    def __str__(self):
+        return "<VertexStore(%d vtxs, %s) at 0x%x>" % (
+            self.count, ', '.join(self._arrays), id(self))
+
+
+    def add(self, name:str, arr:np.ndarray):
+        """Add or replace an attribute's array."""
+        arr = np.asarray(arr)
+        if len(arr) != self.count:
+            raise ValueError("Attribute %s has %d values, expected %d" % (
+                name, len(arr), self.count))
+        self._arrays[name] = arr.reshape(self.count, -1)
+
+
+    def __getitem__(self, name:str) -> np.ndarray:
+        return self._arrays[name]
+
+    def __iter__(self):
+        return iter(self._arrays)
+
+    def __len__(self):
+        return len(self._arrays)
+
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the arrays."""
+        return sum(arr.nbytes for arr in self._arrays.values())
+
+
+    def vertex(self, idx:int) -> Vertex:
+        """Make a Vertex object for the given vertex."""
+        if idx < 0: idx += self.count
+        if idx < 0 or idx >= self.count:
+            raise IndexError("Vertex index %d out of range" % idx)
+        vtx = Vertex()
+        for name, arr in self._arrays.items():
+            vtx.setAttr(name, arr[idx].tolist())
+        return vtx
+
+
+    @property
+    def vtxs(self) -> Sequence:
+        """The vertices as a sequence of Vertex objects, each made
+        when it's accessed.
+        """
+        return VertexList(self)
+
+
+class VertexList(Sequence):
+    """A read-only list of Vertex objects made from a VertexStore."""
+
+    def __init__(self, store:VertexStore):
+        self.store = store
+
+    def __len__(self):
+        return self.store.count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self.store.vertex(i)
+                for i in range(*idx.indices(self.store.count))]
+        return self.store.vertex(idx)
@@ -85,12 +85,14 @@ class FMDL(FresObject):
         self.fres         = fres
         self.headerOffset = None
         self.header       = None
-        self.fvtxs        = []
-        self.fshps        = []
-        self.fmats        = []
         self.udatas       = []
         self.totalVtxs    = None
-        self.skeleton     = None
+        self.lazy         = False
+        # read on first access; see readFromFRES()
+        self._fvtxs       = None
+        self._fshps       = None
+        self._fmats       = None
+        self._skeleton    = None
 
 
     def __str__(self):
@@ -138,8 +140,13 @@ class FMDL(FresObject):
                     i, j, lod.dump()))
 
 
-    def readFromFRES(self, offset=None):
-        """Read this object from FRES."""
+    def readFromFRES(self, offset=None, lazy:bool=False):
+        """Read this object from FRES.
+
+        lazy: Only read the header. The materials, vertex buffers,
+            shapes and skeleton are then read when first accessed,
+            and the vertices when their FVTX's `vtxs` is.
+        """
         if offset is None: offset = self.fres.file.tell()
         self.headerOffset = offset
         if self.fres.header['version'] == (0, 10):
@@ -147,22 +154,93 @@ class FMDL(FresObject):
         else:
             self.header = self.fres.read(Header(), offset)
         self.name   = self.header['name']
-
-        self.fmats = self._readObjects('fmat', FMAT)
-        self.fvtxs = self._readObjects('fvtx', FVTX)
-        self.fshps = self._readObjects('fshp', FSHP)
-        self.skeleton = FSKL(self.fres).readFromFRES(
-            self.header['fskl_offset'])
+        self.lazy   = lazy
+        if not lazy: self.decodeAll()
         # XXX udata
         return self
 
 
-    def _readObjects(self, name, cls):
+    def decodeAll(self):
+        """Read everything that hasn't been read yet."""
+        self.fmats
+        for fvtx in self.fvtxs: fvtx.decodeAll()
+        for fshp in self.fshps: fshp.decodeAll()
+        self.skeleton
+        return self
+
+
+    def exportDecoded(self) -> dict:
+        """Decode the vertices, indices and materials, and return
+        them as plain arrays, lists and dicts, which are cheap to
+        send to another process.
+
+        See `importDecoded()`.
+        """
+        return {
+            'vertices':  [dict(fvtx.vertices) for fvtx in self.fvtxs],
+            'indices':   [[lod.idx_buf for lod in fshp.lods]
+                for fshp in self.fshps],
+            'materials': [fmat.toDict() for fmat in self.fmats],
+        }
+
+
+    def importDecoded(self, data:dict):
+        """Use data decoded elsewhere by `exportDecoded()`, and read
+        the rest, which is quick.
+        """
+        for fvtx, arrays in zip(self.fvtxs, data['vertices']):
+            fvtx.setVertices(arrays)
+        for fshp, idxBufs in zip(self.fshps, data['indices']):
+            fshp.readLods(idxBufs)
+        self._fmats = [FMAT(self.fres).fromDict(fmat)
+            for fmat in data['materials']]
+        self.skeleton
+        return self
+
+
+    @property
+    def fmats(self) -> list:
+        """Materials."""
+        if self._fmats is None:
+            if self.header is None: return []
+            self._fmats = self._readObjects('fmat', FMAT)
+        return self._fmats
+
+
+    @property
+    def fvtxs(self) -> list:
+        """Vertex buffers."""
+        if self._fvtxs is None:
+            if self.header is None: return []
+            self._fvtxs = self._readObjects('fvtx', FVTX, lazy=self.lazy)
+        return self._fvtxs
+
+
+    @property
+    def fshps(self) -> list:
+        """Shapes."""
+        if self._fshps is None:
+            if self.header is None: return []
+            self._fshps = self._readObjects('fshp', FSHP, lazy=self.lazy)
+            for fshp in self._fshps: fshp.fmdl = self
+        return self._fshps
+
+
+    @property
+    def skeleton(self):
+        """The skeleton (FSKL)."""
+        if self._skeleton is None and self.header is not None:
+            self._skeleton = FSKL(self.fres).readFromFRES(
+                self.header['fskl_offset'])
+        return self._skeleton
+
+
+    def _readObjects(self, name, cls, **kwargs):
         """Read objects."""
         objs = []
         offs = self.header[name + '_offset']
         for i in range(self.header[name + '_count']):
-            vtx = cls(self.fres).readFromFRES(offs)
+            vtx = cls(self.fres).readFromFRES(offs, **kwargs)
             objs.append(vtx)
             if self.fres.header['version'] == (0, 10):
                 offs += cls.Header10.size
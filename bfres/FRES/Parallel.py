@@ -0,0 +1,182 @@
+import logging; log = logging.getLogger(__name__)
+import contextlib
+import gc
+import importlib
+import multiprocessing
+import multiprocessing.util
+import os
+import os.path
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from ..BinaryFile import MappedFile
+
+# Decode the models of one FRES in several processes.
+#
+# Each worker maps the same file (or a shared-memory copy of a
+# decompressed one), reads the FRES lazily and decodes the vertices,
+# indices and materials of the models it's given. Those are sent
+# back as plain arrays and dicts (see `FMDL.exportDecoded()`), and
+# the main process fills them into its own models. Workers are
+# spawned, not forked, since forking Blender isn't safe.
+
+_STANDALONE = 'bfres.FRES.Parallel' # our name in the workers
+_prefix     = __name__[:-len(_STANDALONE)] # eg the add-on package
+_root       = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))) # directory the workers import from
+_pathLock   = threading.Lock()
+
+# worker process state
+_fres     = None
+_shm      = None
+_reported = 0 # validation issues already sent back
+
+
+class _Module:
+    """Pickles as an import of the named module."""
+
+    def __init__(self, name:str):
+        self.name = name
+
+    def __reduce__(self):
+        return (importlib.import_module, (self.name,))
+
+
+class WorkerFunc:
+    """A function of this package to run in a worker process.
+
+    Pickles by its plain `bfres` name, which is how the workers
+    import it, rather than by the name it has here.
+    """
+
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def __reduce__(self):
+        module = self.func.__module__[len(_prefix):]
+        return (getattr, (_Module(module), self.func.__qualname__))
+
+
+@contextlib.contextmanager
+def startingWorkers():
+    """Let worker processes started in this block import the package
+    as plain `bfres`.
+
+    Inside Blender the package lives within the add-on package, which
+    workers can't import since it needs `bpy`. Spawned workers copy
+    `sys.path` as they start, so the package's parent directory is
+    added to it just for that. Wrap the pool calls that can start
+    processes (`submit()`, `map()`) in this.
+    """
+    if not _prefix: # already importable as `bfres`
+        yield
+        return
+    with _pathLock:
+        added = _root not in sys.path
+        if added: sys.path.append(_root)
+        try: yield
+        finally:
+            if added: sys.path.remove(_root)
+
+
+def _initWorker(source, size:int, validation:str):
+    """Open the FRES in a worker process."""
+    global _fres, _shm, _reported
+    from . import FRES # not at the top; FRES imports us
+    if size is None: file = MappedFile(source)
+    else:
+        try: _shm = shared_memory.SharedMemory(source, track=False)
+        except TypeError: # before Python 3.13
+            _shm = shared_memory.SharedMemory(source)
+        file = MappedFile(_shm.buf[0:size])
+        multiprocessing.util.Finalize(None, _closeWorker, exitpriority=10)
+    _fres = FRES(file, validation)
+    _fres.decode(lazy=True)
+    # the main process has already checked what we've read so far.
+    _reported = len(_fres.validationReport())
+
+
+def _closeWorker():
+    """Let go of the shared memory when a worker exits."""
+    global _fres, _shm
+    _fres = None
+    gc.collect() # drop everything still viewing the buffer
+    try: _shm.close()
+    except BufferError: pass # freed when the process ends anyway
+    _shm = None
+
+
+def _decodeModels(indices:list) -> tuple:
+    """Decode the given models in a worker process.
+
+    Returns ([(index, result of `FMDL.exportDecoded()`)], validation
+    issues). The result is None for a model that failed to decode;
+    the main process decodes that one itself, so the error is raised
+    there.
+    """
+    global _reported
+    res = []
+    for i in indices:
+        model = _fres.models[i]
+        try:
+            # the main process reads these itself (see
+            # `FMDL.importDecoded()`), so it finds their issues too.
+            for fvtx in model.fvtxs: pass
+            for fshp in model.fshps: fshp.lods
+            _reported = len(_fres.validationReport())
+            res.append((i, model.exportDecoded()))
+        except Exception:
+            res.append((i, None))
+    issues    = _fres.validationReport()[_reported:]
+    _reported += len(issues)
+    return res, issues
+
+
+def decodeModels(fres, workers:int=None):
+    """Fully decode the (lazily read) models of `fres` using a pool
+    of `workers` processes (default: one per CPU).
+
+    The decoded data is filled into the models in `fres.models`.
+    """
+    models  = fres.models
+    workers = min(workers or os.cpu_count() or 1, len(models))
+    if workers < 2:
+        for model in models: model.decodeAll()
+        return
+
+    # more chunks than workers, so one big model doesn't hold up the rest
+    nChunks = min(len(models), workers * 4)
+    chunks  = [list(range(i, len(models), nChunks)) for i in range(nChunks)]
+
+    file = fres.file
+    path = getattr(file, 'path', None)
+    shm  = None
+    if type(path) is str and os.path.isfile(path):
+        source, size = path, None
+    else: # decompressed or in memory; share a copy
+        size   = file.size
+        shm    = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        shm.buf[0:size] = file.view(size, 0)
+        source = shm.name
+
+    log.info("Decoding %d models in %d processes", len(models), workers)
+    try:
+        with ProcessPoolExecutor(workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=WorkerFunc(_initWorker),
+        initargs=(source, size, fres.validation)) as pool:
+            with startingWorkers():
+                results = pool.map(WorkerFunc(_decodeModels), chunks)
+            for res, issues in results:
+                for i, data in res:
+                    if data is None: models[i].decodeAll()
+                    else: models[i].importDecoded(data)
+                file.addIssues(issues)
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
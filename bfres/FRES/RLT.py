@@ -1,4 +1,5 @@
 import logging; log = logging.getLogger(__name__)
+import numpy as np
 from ..BinaryStruct import BinaryStruct, BinaryObject
 from ..BinaryStruct.Padding import Padding
 from ..BinaryStruct.StringOffset import StringOffset
@@ -17,6 +18,9 @@ from .FresObject import FresObject
 # actually parsing them, the whole file is loaded into memory,
 # and this table is used to locate the structs. So the pointers
 # must be correct, but mostly aren't needed to parse the file.
+# Each entry covers `structCount` structs starting at `curOffset`,
+# each holding `offsetCount` consecutive 64-bit pointers followed
+# by `stride` pointer-sized slots that aren't pointers.
 
 class Header(BinaryStruct):
     """RLT header."""
@@ -53,16 +57,23 @@ class Entry(BinaryStruct):
     size = 0x08
 
 
-    #def readFromFile(self, file, offset):
-    #    data = super().readFromFile(file, offset)
-    #    for i in range(data['structCount']):
+    # for reading the whole entry table at once
+    dtype = np.dtype([
+        ('curOffset',   '<u4'),
+        ('structCount', '<u2'),
+        ('offsetCount', 'u1'),
+        ('stride',      'u1'),
+    ])
 
 
 class RLT(FresObject):
     """A relocation table in an FRES."""
 
     def __init__(self, fres):
-        self.fres = fres
+        self.fres      = fres
+        self.slots     = None # file offsets of every pointer
+        self.values    = None # the pointers stored there
+        self.slotEntry = None # index of the entry each came from
 
 
     def dump(self):
@@ -103,10 +114,75 @@ class RLT(FresObject):
             offset += Section.size
 
         # read entries
-        self.entries = []
-        for i in range(numEntries):
-            entry = Entry().readFromFile(self.fres.file, offset)
-            offset += Entry.size
-            self.entries.append(entry)
+        avail = max(0, self.fres.file.size - offset) // Entry.size
+        if numEntries > avail:
+            log.warning("RLT: %d entries but only room for %d before EOF",
+                numEntries, avail)
+            numEntries = avail
+        self.entries = np.frombuffer(
+            self.fres.file.view(numEntries * Entry.size, offset),
+            dtype=Entry.dtype)
+        return self
+
 
+    def buildIndex(self):
+        """Find every pointer slot described by the entries.
+
+        Fills `slots`, `values` and `slotEntry` (NumPy arrays in file
+        order), in one pass with no per-pointer Python code. Called
+        by `validate()`.
+        """
+        ent    = self.entries
+        cur    = ent['curOffset'].astype(np.int64)
+        nPtr   = ent['offsetCount'].astype(np.int64)
+        step   = (nPtr + ent['stride']) * 8
+        counts = ent['structCount'] * nPtr
+
+        # for slot k of entry e: struct k // nPtr, pointer k % nPtr
+        e = np.repeat(np.arange(len(ent)), counts)
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts,
+            counts)
+        slots = cur[e] + (k // nPtr[e]) * step[e] + (k % nPtr[e]) * 8
+
+        # read them all with one gather over the part of the file
+        # they span (a view, if the file is mapped).
+        file   = self.fres.file
+        inside = slots + 8 <= file.size
+        values = np.zeros(len(slots), dtype=np.uint64)
+        if inside.any():
+            start = int(slots[inside].min())
+            end   = int(slots[inside].max()) + 8
+            data  = np.frombuffer(file.view(end - start, start),
+                dtype=np.uint8)
+            idx   = slots[inside, None] - start + np.arange(8)
+            values[inside] = data[idx].view('<u8').ravel()
+
+        self.slots     = slots
+        self.values    = values
+        self.slotEntry = e
         return self
+
+
+    def validate(self, res=None, offset:int=0, fileSize:int=None) -> list:
+        """Check every pointer listed in the table.
+
+        Takes the same arguments as `BinaryStruct.validate()` so it
+        can be queued in the file's `pendingChecks`; `res` and
+        `offset` are unused.
+        Returns a list of problem descriptions.
+        """
+        if self.slots is None: self.buildIndex()
+        if fileSize is None: fileSize = self.fres.file.size
+        issues = []
+        slots, values = self.slots, self.values
+        for i in np.flatnonzero(slots + 8 > fileSize).tolist():
+            issues.append("RLT entry %d: Pointer slot 0x%X is past EOF 0x%X" % (
+                self.slotEntry[i], slots[i], fileSize))
+        for i in np.flatnonzero(values > fileSize).tolist():
+            issues.append("RLT entry %d: Pointer at 0x%X = 0x%X but EOF = 0x%X" % (
+                self.slotEntry[i], slots[i], values[i], fileSize))
+        order = np.sort(slots)
+        for i in np.flatnonzero(np.diff(order) < 8).tolist():
+            issues.append("RLT: Pointer slots 0x%X and 0x%X overlap" % (
+                order[i], order[i+1]))
+        return issues
@@ -1,5 +1,5 @@
 import logging; log = logging.getLogger(__name__)
-from ..BinaryStruct import BinaryStruct, BinaryObject
+from ..BinaryStruct import BinaryStruct, BinaryObject, VALIDATION_POLICIES
 from ..BinaryStruct.StringOffset import StringOffset
 from ..BinaryStruct.Padding import Padding
 from ..BinaryStruct.Switch import Offset32, Offset64, String
@@ -9,6 +9,7 @@ from ..Common import StringTable
 from ..Exceptions import \
     UnsupportedFormatError, UnsupportedFileTypeError
 from .Dict import Dict
+from . import Parallel
 from .EmbeddedFile import EmbeddedFile, Header as EmbeddedFileHeader
 from .FMDL import FMDL, Header as FMDLHeader
 from .BufferSection import BufferSection
@@ -148,7 +149,16 @@ class SwitchHeader10(BinaryStruct):
 class FRES(DumpMixin):
     """FRES file."""
 
-    def __init__(self, file:BinaryFile):
+    def __init__(self, file:BinaryFile, validation:str='strict'):
+        """Create FRES.
+
+        file: The file to read.
+        validation: How strictly to check the structures read;
+            one of BinaryStruct.VALIDATION_POLICIES.
+        """
+        if validation not in VALIDATION_POLICIES:
+            raise ValueError("Unknown validation policy '%s'" % validation)
+        file.validation = validation
         self.file       = file
         self.models     = [] # fmdl
         self.animations = [] # fska
@@ -195,15 +205,29 @@ class FRES(DumpMixin):
                 self.header['byte_order'])
 
 
-    def decode(self):
-        """Decode objects from the file."""
+    def decode(self, eagerStrings:bool=False, lazy:bool=False,
+    workers:int=0):
+        """Decode objects from the file.
+
+        eagerStrings: Decode the whole string table up front, rather
+            than as strings are needed. Useful for dumps.
+        lazy: Only read each model's header and name; its contents
+            are read when first accessed. See `FMDL.readFromFRES()`.
+        workers: If more than 1, decode the models in this many
+            processes. See `Parallel.decodeModels()`.
+        """
         self.rlt = RLT(self).readFromFRES()
+        if self.validation == 'strict':
+            for msg in self.rlt.validate(): log.warning("%s", msg)
+        elif self.validation == 'deferred':
+            self.file.pendingChecks.append((self.rlt, None, 0))
 
         # str_tab_offset points to the first actual string, not
         # the header. (maybe it's actually the offset of some string,
         # which happens to be empty here?)
         offs = self.header['str_tab_offset'] - StringTable.Header.size
-        self.strtab = StringTable().readFromFile(self, offs)
+        self.strtab = StringTable(eagerStrings).readFromFile(self, offs)
+        self.file.stringPool = self.strtab
 
         self._readBufferSection()
 
@@ -211,12 +235,17 @@ class FRES(DumpMixin):
             EmbeddedFile, 'embed', EmbeddedFileHeader.size)
 
         self.models = self._readObjects(FMDL, 'fmdl',
-            FMDLHeader.size)
+            FMDLHeader.size, lazy=lazy or workers > 1)
+        if workers > 1 and not lazy:
+            Parallel.decodeModels(self, workers)
         # XXX fska, fmaa, fvis, fshu, fscn
 
 
-    def _readObjects(self, typ, name, size):
-        """Read array of objects from the file."""
+    def _readObjects(self, typ, name, size, **kwargs):
+        """Read array of objects from the file.
+
+        kwargs: Passed to each object's `readFromFRES()`.
+        """
         offs = self.header[name + '_offset']
         cnt  = self.header[name + '_cnt']
         dofs = self.header[name + '_dict_offset']
@@ -225,10 +254,10 @@ class FRES(DumpMixin):
         if dofs == 0: return objs
         objDict = Dict(self).readFromFRES(dofs)
         for i in range(cnt):
-            objName = objDict.root.left.name
+            objName = objDict.nodes[i+1].name
             log.debug('Reading %s #%2d @ %06X: "%s"',
                 typ.__name__, i, offs, objName)
-            obj = typ(self, objName).readFromFRES(offs)
+            obj = typ(self, objName).readFromFRES(offs, **kwargs)
             objs.append(obj)
             offs += size
         return objs
@@ -308,6 +337,48 @@ class FRES(DumpMixin):
         return self.file.read(pos=pos, fmt=size, count=count)
 
 
+    def readArray(self, fmt:str, pos:int=None, count:int=1):
+        """Read an array of records from the file.
+
+        See `BinaryFile.readArray()`.
+        """
+        return self.file.readArray(fmt, pos, count)
+
+
+    @property
+    def validation(self) -> str:
+        """Validation policy of the underlying file."""
+        return self.file.validation
+
+
+    @property
+    def stringPool(self) -> StringTable:
+        """The string table, used to look up strings by offset."""
+        return self.file.stringPool
+
+
+    @property
+    def pendingChecks(self) -> list:
+        return self.file.pendingChecks
+
+
+    def validationReport(self) -> list:
+        """Get problems found by deferred validation."""
+        return self.file.validationReport()
+
+
+    def unpack(self, st:struct.Struct, pos:int=None) -> tuple:
+        """Read a precompiled struct from the file."""
+        return self.file.unpack(st, pos)
+
+
+    def view(self, size:int, pos:int=None) -> memoryview:
+        """Get `size` bytes from the file as a memoryview,
+        without copying if the file is mapped.
+        """
+        return self.file.view(size, pos)
+
+
     def seek(self, pos, whence=0):
         """Seek the file."""
         return self.file.seek(pos, whence)
@@ -320,9 +391,17 @@ class FRES(DumpMixin):
 
     def readStr(self, offset, fmt='<H', encoding='shift-jis'):
         """Read string (prefixed with length) from given offset."""
+        pool = self.file.stringPool
+        if pool is not None and fmt == pool.lenprefix \
+        and encoding == pool.encoding:
+            data = pool.get(offset)
+            if data is not None: return data
+        else: pool = None
+
         size = self.read(fmt, offset)
         data = self.read(size)
         if encoding is not None: data = data.decode(encoding)
+        if pool is not None: data = pool.add(offset, data)
         return data
 
 
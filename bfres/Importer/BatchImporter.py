@@ -0,0 +1,130 @@
+import logging; log = logging.getLogger(__name__)
+import bpy
+import os.path
+from concurrent.futures import ThreadPoolExecutor
+from ..BNTX.Parallel import TextureDecoder
+from .Importer import Importer
+from .TextureImporter import TextureImporter
+
+
+class BatchImporter:
+    """Imports several files, sharing materials and images
+    between them.
+
+    Each file is read, decompressed and decoded on a worker thread
+    while the previous one is being added to the scene, so the two
+    overlap. Textures are decoded in the background too, and their
+    images filled in once ready.
+    """
+
+    def __init__(self, operator, context):
+        self.operator  = operator
+        self.context   = context
+        self.options   = Importer.readOptions(operator) # see Importer
+        self.materials = {} # name => Blender material
+        self.images    = {} # name => Blender image
+        self.bntxs     = set() # hashes of imported BNTXs
+        self.pendingImages  = [] # see TextureImporter
+        self.textureDecoder = None
+        self.diskCache = Importer.makeCache(self.options) # see Importer
+        self._current  = 0 # index of the file being imported
+        self._count    = 0
+
+
+    @staticmethod
+    def findFiles(paths:list, texFiles:bool=True) -> list:
+        """Get the list of files to import.
+
+        paths: Selected files.
+        texFiles: Whether to also import the `.Tex` file next to
+            each one (eg `Foo.Tex.sbfres` for `Foo.sbfres`, or
+            `Foo.Tex.bfres.zs` for `Foo.bfres.zs`).
+
+        Texture files come before the file that uses them, so
+        their images exist when its materials are created.
+        """
+        res = []
+        for path in paths:
+            if texFiles:
+                base, ext = os.path.splitext(path)
+                if ext == '.zs': # eg '.bfres.zs'
+                    base, inner = os.path.splitext(base)
+                    ext = inner + ext
+                texPath = base + '.Tex' + ext
+                if os.path.exists(texPath) and texPath not in res:
+                    log.info("Importing linked file: %s", texPath)
+                    res.append(texPath)
+            if path not in res: res.append(path)
+        return res
+
+
+    def progress(self, fraction:float):
+        """Report progress within the file being imported."""
+        self.wm.progress_update(self._current + fraction)
+
+
+    def _load(self, path:str) -> Importer:
+        """Read and decode a file. Runs on the worker thread."""
+        importer = Importer(self.operator, self.context, self)
+        importer.load(path)
+        return importer
+
+
+    def run(self, paths:list) -> set:
+        """Import the given files.
+
+        A file that fails to import is reported and skipped.
+        Returns the operator result.
+        """
+        paths = self.findFiles(paths, self.operator.import_tex_file)
+        self.wm = bpy.context.window_manager
+        self._count = len(paths)
+        self.wm.progress_begin(0, self._count)
+        self.textureDecoder = TextureDecoder(
+            max(1, self.options.decode_workers))
+        try:
+            failed = self._importAll(paths)
+        finally:
+            self.textureDecoder.shutdown()
+        Importer.trimCache(self.diskCache)
+        self.wm.progress_end()
+
+        if failed:
+            log.error("%d of %d files failed to import", failed, len(paths))
+        return {'CANCELLED'} if paths and failed == len(paths) \
+            else {'FINISHED'}
+
+
+    def _importAll(self, paths:list) -> int:
+        """Import the given files.
+
+        Returns the number of files that failed.
+        """
+        failed = 0
+        # one worker, so only the next file is held in memory
+        # while the current one is imported.
+        with ThreadPoolExecutor(1, thread_name_prefix='bfres-load') as pool:
+            pending = pool.submit(self._load, paths[0]) if paths else None
+            for i, path in enumerate(paths):
+                self._current = i
+                future  = pending
+                pending = None
+                if i+1 < len(paths):
+                    pending = pool.submit(self._load, paths[i+1])
+
+                log.info("Importing file %3d / %3d: %s",
+                    i+1, self._count, path)
+                try:
+                    future.result().importLoaded()
+                except Exception as ex:
+                    log.exception("Failed to import %s", path)
+                    self.operator.report({'ERROR'},
+                        "Failed to import %s: %s" % (path, ex))
+                    failed += 1
+                self.wm.progress_update(i+1)
+                # fill in the images already decoded, rather than
+                # holding on to all of them until the end.
+                TextureImporter(self).finishTextures(wait=False)
+
+        TextureImporter(self).finishTextures()
+        return failed
@@ -1,5 +1,6 @@
 import logging; log = logging.getLogger(__name__)
 import bmesh
+import hashlib
 import bpy
 import bpy_extras
 import os
@@ -7,19 +8,56 @@ import os.path
 import tempfile
 import shutil
 import struct
+import sys
 import math
-import zstandard
+import types
 from ..Exceptions import UnsupportedFileTypeError
-from ..BinaryFile import BinaryFile
-from .. import YAZ0, FRES, BNTX
+from ..BinaryFile import BinaryFile, MappedFile
+from .. import YAZ0, ZSTD, FRES, BNTX
+from ..BNTX.Parallel import TextureDecoder
+from ..Cache import Cache
 from .ModelImporter import ModelImporter
 from .TextureImporter import TextureImporter
 
 
 class Importer(ModelImporter):
-    def __init__(self, operator, context):
+    def __init__(self, operator, context, batch=None):
+        """Create Importer.
+
+        batch: BatchImporter this import is part of, whose
+            materials and images are shared with the other files
+            in the batch. None for a standalone import.
+        """
         self.operator = operator
         self.context  = context
+        self.batch    = batch
+        # settings for `load()`, which mustn't touch `operator`.
+        self.options  = self.readOptions(operator) if batch is None \
+            else batch.options
+        self.wm       = None # window manager to report progress to
+        self.loaded   = None # decoded FRES or BNTX, from `load()`
+        # on-disk cache, shared by the batch; None if disabled.
+        self.diskCache = self.makeCache(self.options) if batch is None \
+            else batch.diskCache
+        self.cache    = None # CacheEntry of the file being imported
+        self._cacheSource = None # the file it belongs to
+
+        # Blender materials and images by their name in the file,
+        # since Blender renames them if the name is already taken.
+        self.materials = {} if batch is None else batch.materials
+        self.images    = {} if batch is None else batch.images
+
+        # textures are decoded in the background while the models
+        # are imported; see TextureImporter.
+        self.pendingImages  = [] if batch is None else batch.pendingImages
+        self.textureDecoder = TextureDecoder(0) if batch is None \
+            else batch.textureDecoder
+        self.textureFutures = {} # BNTX => Futures of its textures
+        self.bntxKeys       = {} # BNTX => hash, to record once imported
+
+        # decoded vertices of each FVTX, shared by the LODs that
+        # use it; see LodImporter.
+        self.vertexStores = {}
 
         # Keep a link to the add-on preferences.
         #self.addon_prefs = #context.user_preferences.addons[__package__].preferences
@@ -35,26 +73,145 @@ class Importer(ModelImporter):
         return group
 
 
+    @staticmethod
+    def readOptions(operator):
+        """Copy the settings that `load()` uses from the operator.
+
+        `load()` can run on a worker thread, where Blender's
+        properties and `bpy.path` mustn't be used, so this must be
+        called on the main thread.
+
+        Returns a namespace of plain values, with absolute paths.
+        """
+        # data cached by other versions of the add-on isn't used.
+        addon   = sys.modules.get(type(operator).__module__)
+        version = getattr(addon, 'bl_info', {}).get('version', ())
+        cacheDir = getattr(operator, 'cache_dir', '')
+        dictPath = getattr(operator, 'zs_dict_path', '')
+        return types.SimpleNamespace(
+            use_cache      = getattr(operator, 'use_cache', False),
+            cache_dir      = bpy.path.abspath(cacheDir) if cacheDir else None,
+            cache_size     = getattr(operator, 'cache_size_mb', 2048) * 1024 * 1024,
+            cache_version  = '.'.join(map(str, version)),
+            zs_dict_path   = bpy.path.abspath(dictPath) if dictPath else '',
+            max_in_memory  = getattr(operator, 'max_in_memory_mb', 512) * 1024 * 1024,
+            save_decompressed = getattr(operator, 'save_decompressed', False),
+            dump_debug     = getattr(operator, 'dump_debug', False),
+            decode_workers = getattr(operator, 'decode_workers', 0),
+            validation     = getattr(operator, 'validation', 'strict'),
+        )
+
+
+    @staticmethod
+    def makeCache(options):
+        """Create the on-disk cache, or return None if it's disabled.
+
+        options: Result of `readOptions()`.
+        """
+        if not options.use_cache: return None
+        return Cache(options.cache_dir, options.cache_size,
+            options.cache_version)
+
+
+    @staticmethod
+    def trimCache(cache):
+        """Keep the on-disk cache within its size limit.
+
+        Called once the imports using it are done, rather than after
+        each file.
+        """
+        if cache is None: return
+        freed = cache.trim()
+        if freed:
+            log.info("Evicted %d KiB from the cache", freed // 1024)
+
+
     def run(self, path, **keywords):
         """Perform the import."""
-        self.wm   = bpy.context.window_manager
+        self.wm = bpy.context.window_manager
+        self.textureDecoder = TextureDecoder(
+            max(1, self.options.decode_workers))
+        try:
+            self.load(path)
+            result = self.importLoaded()
+            TextureImporter(self).finishTextures()
+            self.trimCache(self.diskCache)
+            return result
+        finally:
+            self.textureDecoder.shutdown()
+
+
+    def load(self, path):
+        """Read, decompress and decode the file at `path`.
+
+        Doesn't touch the Blender scene, so it can run on a worker
+        thread while another file is imported. Follow with
+        `importLoaded()`.
+        """
         self.path = path
-        return self.unpackFile(path)
+        file = MappedFile(path)
+        self._openCache(file)
+        try:
+            self.loaded = self.decodeFile(file)
+        except BaseException:
+            self._closeCache()
+            raise
+
+
+    def importLoaded(self):
+        """Add the file decoded by `load()` to the scene."""
+        try:
+            return self.importObject(self.loaded)
+        finally:
+            self.loaded = None
+            self._closeCache()
+
+
+    def _openCache(self, file):
+        """Get the cache entry for the given input file, if the
+        cache is enabled.
+        """
+        if self.diskCache is None: return
+        self.cache = self.diskCache.entry(file.view(file.size, 0))
+        self._cacheSource = file
+        file.seek(0)
+        log.debug("Cache entry for %s: %s", file.name, self.cache.path)
+
+
+    def _closeCache(self):
+        """Log how the cache did, and let go of the entry."""
+        if self.cache is None: return
+        log.info("Cache: %d hits, %d misses",
+            self.cache.hits, self.cache.misses)
+        self.cache.close()
+        self.cache = self._cacheSource = None
 
 
     def unpackFile(self, file):
-        """Try to unpack the given file.
+        """Try to unpack and import the given file.
+
+        See `decodeFile()`.
+        """
+        return self.importObject(self.decodeFile(file))
+
 
-        file: A file object, or a path to a file.
+    def decodeFile(self, file):
+        """Try to decode the given file.
 
-        If the file format is recognized, will try to unpack it.
+        file: A file object, a path to a file, or a bytes-like
+            object holding the file contents.
+
+        If the file format is recognized, will try to decode it.
         If the file is compressed, will first decompress it and
-        then try to unpack the result.
+        then try to decode the result.
+        Returns the decoded FRES or BNTX.
         Raises UnsupportedFileTypeError if the file format isn't
         recognized.
         """
         if type(file) is str: # a path
-            file = BinaryFile(file)
+            file = MappedFile(file)
+        elif isinstance(file, (bytes, bytearray, memoryview)):
+            file = MappedFile(file)
         self.file = file
 
         # read magic from header
@@ -63,38 +220,91 @@ class Importer(ModelImporter):
         file.seek(0) # rewind
         match magic:
             case b'Yaz0' | b'Yaz1': # Compressed YAZ file
-                r = self.decompressYaz(file)
-                return self.unpackFile(r)
+                r = self._decompress(file, self.decompressYaz)
+                return self.decodeFile(r)
             
             case b'(\xb5/\xfd': # Compressed ZSTD file
-                r = self.decompressZS(file)
-                return self.unpackFile(r)
+                r = self._decompress(file, self.decompressZS)
+                return self.decodeFile(r)
             
             case b'FRES':
-                return self._importFres(file)
+                return self._decodeFres(file)
 
             case b'BNTX':
-                return self._importBntx(file)
+                return self._decodeBntx(file)
             case _:
                 raise UnsupportedFileTypeError(magic)
 
-    def decompressZS(self, file):
-        filecontents = file.read(file.size, 0)
-        decompressed = zstandard.decompress(filecontents)
-        result = tempfile.TemporaryFile()
-        result.write(decompressed)
+
+    def importObject(self, obj):
+        """Import a FRES or BNTX from `decodeFile()`."""
+        if isinstance(obj, BNTX.BNTX): return self._importBntx(obj)
+        return self._importFres(obj)
+
+
+    def _maxInMemorySize(self) -> int:
+        """Largest decompressed size to keep in memory, in bytes.
+
+        Anything bigger is decompressed to a temporary file.
+        """
+        return self.options.max_in_memory
+
+
+    def _decompress(self, file, decompress):
+        """Decompress given file using the given method, or get the
+        result from the cache.
+        """
+        if self.cache is None or file is not self._cacheSource:
+            return decompress(file)
+
+        path = self.cache.getFile('decompressed')
+        if path is not None:
+            log.debug("Using cached decompressed file %s", path)
+            result = MappedFile(path, name=file.name)
+            self._saveDecompressed(file, result)
+            return result
+
+        result = decompress(file)
+        self.cache.putFile('decompressed', result.view(result.size, 0))
         result.seek(0)
-        return BinaryFile(result)
+        return result
+
+
+    def decompressZS(self, file):
+        """Decompress given file.
+
+        Returns a memory-backed BinaryFile, or one backed by a
+        temporary file if the data is too large to keep in memory.
+        """
+        # newer games compress against a shared dictionary.
+        dictPath = self.options.zs_dict_path
+        if dictPath:
+            ZSTD.loadDictionaryPack(dictPath)
+        elif ZSTD.frameDictId(file) != 0:
+            dictPath = ZSTD.findDictionaryPack(file.name)
+            if dictPath is None:
+                log.error("File needs a zstd dictionary, but no ZsDic.pack.zs was found near it")
+            else:
+                ZSTD.loadDictionaryPack(dictPath)
+
+        log.debug("Decompressing input file...")
+        data   = ZSTD.decompressFile(file, self._maxInMemorySize())
+        result = MappedFile(data, name=file.name)
+        self._saveDecompressed(file, result)
+        return result
+
 
     def decompressYaz(self, file):
         """Decompress given file.
 
-        Returns a temporary file.
+        Returns a memory-backed BinaryFile, or one backed by a
+        temporary file if the data is too large to keep in memory.
         """
         log.debug("Decompressing input file...")
-        result = tempfile.TemporaryFile()
 
-        # make progress callback to update UI
+        # make progress callback to update UI.
+        # not when loading on a worker thread (see `load()`), since
+        # Blender's UI can only be used from the main thread.
         progress = 0
         def progressCallback(cur, total):
             nonlocal progress
@@ -103,36 +313,82 @@ class Importer(ModelImporter):
                 self.wm.progress_update(pct)
                 progress = pct
             print("\rDecompressing... %3d%%" % pct, end='')
-        self.wm.progress_begin(0, 100)
+        if self.wm is None: progressCallback = None
+        else: self.wm.progress_begin(0, 100)
 
         # decompress the file
         decoder = YAZ0.Decoder(file, progressCallback)
-        for data in decoder.bytes():
-            result.write(data)
-        self.wm.progress_end()
-        print("") # end status line
+        if decoder.size <= self._maxInMemorySize():
+            result = MappedFile(decoder.decompress(), name=file.name)
+        else:
+            result = tempfile.TemporaryFile()
+            for data in decoder.blocks():
+                result.write(data)
+            result.seek(0)
+            result = MappedFile(result, name=file.name)
+        if self.wm is not None:
+            self.wm.progress_end()
+            print("") # end status line
+
+        self._saveDecompressed(file, result)
+        return result
+
+
+    def _saveDecompressed(self, file, result):
+        """Write decompressed data back to a file next to the
+        original, if requested.
+        """
+        if not self.options.save_decompressed: return
+        path, ext = os.path.splitext(file.name)
+        # 's' prefix indicates compressed;
+        # eg '.sbfres' is compressed '.bfres'
+        # and '.bfres.zs' is compressed '.bfres'
+        if ext == '.zs': ext = ''
+        elif ext.startswith('.s'): ext = '.'+ext[2:]
+        else: ext = '.out'
+        log.info("Saving decompressed file to: %s", path+ext)
+        result.seek(0)
+        with open(path+ext, 'wb') as save:
+            shutil.copyfileobj(result.file, save)
         result.seek(0)
 
-        if self.operator.save_decompressed: # write back to file
-            path, ext = os.path.splitext(file.name)
-            # 's' prefix indicates compressed;
-            # eg '.sbfres' is compressed '.bfres'
-            if ext.startswith('.s'): ext = '.'+ext[2:]
-            else: ext = '.out'
-            log.info("Saving decompressed file to: %s", path+ext)
-            with open(path+ext, 'wb') as save:
-                shutil.copyfileobj(result, save)
-            result.seek(0)
 
-        return BinaryFile(result)
+    def _validation(self) -> str:
+        """Get the validation policy to parse files with."""
+        return self.options.validation
+
+
+    def _reportValidation(self, obj):
+        """Log problems found by deferred validation."""
+        if self._validation() != 'deferred': return
+        issues = obj.validationReport()
+        if issues:
+            log.warning("%d structure problems in %s:\n  %s",
+                len(issues), obj.file.name, '\n  '.join(issues))
+
+
+    def _decodeFres(self, file):
+        """Decode FRES file."""
+        fres = FRES.FRES(file, self._validation())
+        # once the file is cached, most of the model data comes from
+        # there, so only read what the import actually uses. That's
+        # read as needed, in this process, so `decode_workers` only
+        # applies when nothing is cached yet.
+        lazy = self.cache is not None and not self.cache.isNew
+        if lazy and self.options.decode_workers > 1:
+            log.debug("Reading cached models as needed, not in %d processes",
+                self.options.decode_workers)
+        fres.decode(eagerStrings=self.options.dump_debug,
+            lazy=lazy, workers=self.options.decode_workers)
+        self._reportValidation(fres)
+        return fres
 
 
-    def _importFres(self, file):
-        """Import FRES file."""
-        self.fres = FRES.FRES(file)
-        self.fres.decode()
+    def _importFres(self, fres):
+        """Import decoded FRES file."""
+        self.fres = fres
 
-        if self.operator.dump_debug:
+        if self.options.dump_debug:
             with open('./fres-%s-dump.txt' % self.fres.name, 'w') as f:
                 f.write(self.fres.dump())
             #print("FRES contents:\n" + self.fres.dump())
@@ -146,6 +402,8 @@ class Importer(ModelImporter):
             log.info("Importing model    %3d / %3d...",
                 i+1, len(self.fres.models))
             self._importModel(model)
+            if self.batch is not None:
+                self.batch.progress((i+1) / len(self.fres.models))
 
         return {'FINISHED'}
 
@@ -154,24 +412,50 @@ class Importer(ModelImporter):
         """Import embedded file from FRES."""
         if file.name.endswith('.txt'): # embed into blend file
             obj = bpy.data.texts.new(name=file.name)
-            obj.write(file.data.decode('utf-8'))
+            obj.write(str(file.data, 'utf-8'))
         else: # try to decode, may be BNTX
             try:
-                self.unpackFile(file.toTempFile())
+                self.unpackFile(file.toBinaryFile())
             except UnsupportedFileTypeError as ex:
                 log.debug("Embedded file '%s' is of unsupported type '%s'",
                     file.name, ex.magic)
 
 
-    def _importBntx(self, file):
-        """Import BNTX file."""
-        self.bntx = BNTX.BNTX(file)
-        self.bntx.decode()
-        if self.operator.dump_debug:
+    def _decodeBntx(self, file):
+        """Decode BNTX file."""
+        bntx = BNTX.BNTX(file, self._validation())
+        bntx.decode(eagerStrings=self.options.dump_debug)
+        self._reportValidation(bntx)
+        if self.batch is not None:
+            # the same textures are often in several files of a
+            # batch (eg embedded in each model of a set).
+            key = hashlib.sha1(bntx.file.view(bntx.file.size, 0)).digest()
+            if key in self.batch.bntxs: return bntx
+            self.bntxKeys[bntx] = key
+
+        # start decoding the textures now, so they're done by the
+        # time the models are.
+        self.textureFutures[bntx] = TextureImporter(self).decodeTextures(bntx)
+        return bntx
+
+
+    def _importBntx(self, bntx):
+        """Import decoded BNTX file."""
+        self.bntx = bntx
+        futures = self.textureFutures.pop(bntx, None)
+        if futures is None:
+            log.info("Textures '%s' already imported", bntx.name)
+            return {'FINISHED'}
+
+        if self.options.dump_debug:
             with open('./fres-%s-bntx-dump.txt' % self.bntx.name, 'w') as f:
                 f.write(self.bntx.dump())
 
         imp = TextureImporter(self)
-        imp.importTextures(self.bntx)
+        imp.importTextures(self.bntx, futures)
 
+        # only now, so if importing fails, a later file with the
+        # same textures still imports them.
+        key = self.bntxKeys.pop(bntx, None)
+        if key is not None: self.batch.bntxs.add(key)
         return {'FINISHED'}
@@ -3,8 +3,10 @@ import bmesh
 import bpy
 import bpy_extras
 import struct
+import numpy as np
 from .MaterialImporter import MaterialImporter
 from .SkeletonImporter import SkeletonImporter
+from ..FRES.FMDL.VertexStore import VertexStore
 from ..Exceptions import UnsupportedFormatError, MalformedFileError
 import mathutils
 
@@ -22,7 +24,7 @@ class LodImporter:
         self.fshp   = fshp
         self.lod    = lod
         self.lodIdx = idx
-        self.attrBuffers = self._getAttrBuffers()
+        self.attrBuffers, self.idxBuf, self.vtxMap = self._loadBuffers()
 
         # Create an object for this LOD
         if self.parent.operator.first_lod == True:
@@ -38,57 +40,76 @@ class LodImporter:
         return self.meshObj
 
 
-    def _getAttrBuffers(self):
-        """Get attribute data for this LOD.
+    def _loadBuffers(self):
+        """Get attribute data and index buffer for this LOD.
 
-        Returns a dict of attribute name => [values].
+        Returns (attribute buffers, index buffer, vertex map); see
+        `_getAttrBuffers()`.
         """
-        attrBuffers = {}
-        for attr in self.fvtx.attrs:
-            attrBuffers[attr.name] = []
+        return self._getAttrBuffers(self._loadVertices())
+
+
+    def _loadVertices(self):
+        """Get the decoded vertices of this LOD's FVTX, from the
+        cache if possible.
 
-        #log.debug("LOD submeshes: %s", self.lod.submeshes)
+        Each FVTX is only decoded once, however many shapes and
+        LODs use it.
+
+        Returns a VertexStore.
+        """
+        name   = 'fvtx/%s/%d' % (self.fmdl.name, self.fshp.header['fvtx_idx'])
+        stores = self.parent.vertexStores
+        if name in stores: return stores[name]
+
+        cache  = self.parent.cache
+        arrays = None if cache is None else cache.getArrays(name)
+        store  = None
+        if arrays is not None:
+            try: store = VertexStore(self.fvtx.header['num_vtxs'], arrays)
+            except ValueError: log.warning("Ignoring bad cached %s", name)
+        if store is None:
+            store = self.fvtx.vertices
+            if cache is not None: cache.putArrays(name, dict(store))
+        stores[name] = store
+        return store
+
+
+    def _getAttrBuffers(self, vertices):
+        """Get attribute data for this LOD.
 
+        vertices: The FVTX's VertexStore.
+
+        LODs, especially the less detailed ones, usually use only
+        some of the FVTX's vertices, so only those are taken, and
+        the indices renumbered to match.
+
+        Returns (attribute buffers, index buffer, vertex map):
+        attribute buffers: Dict of attribute name => array of values
+            of the vertices this LOD uses.
+        index buffer: The LOD's indices into those arrays.
+        vertex map: The FVTX vertex index of each of them.
+        """
         for i, submesh in enumerate(self.lod.submeshes):
-            log.debug("Reading submesh %d...", i)
-            idxs = submesh['idxs']
-            if len(idxs) == 0:
+            if len(submesh['idxs']) == 0:
                 raise MalformedFileError("Submesh %d is empty" % i)
-            #log.debug("Submesh idxs (%d): %s", len(idxs), idxs)
-            for idx in range(max(idxs)+1):
-                for attr in self.fvtx.attrs:
-                    fmt  = attr.format
-                    func = fmt.get('func', None)
-                    size = struct.calcsize(fmt['fmt'])
-                    buf  = self.fvtx.buffers[attr.buf_idx]
-                    offs = attr.buf_offs + (idx * buf.stride)
-                    data = buf.data[offs : offs + size]
-                    try:
-                        data = struct.unpack(fmt['fmt'], data)
-                    except struct.error:
-                        log.error("Submesh %d reading out of bounds for attribute '%s' (offs=0x%X len=0x%X fmt=%s)",
-                            i, attr.name, offs, len(buf.data),
-                            fmt['fmt'])
-                        raise MalformedFileError("Submesh %d reading out of bounds for attribute '%s'" % (
-                            i, attr.name))
-                    if func: data = func(data)
-                    attrBuffers[attr.name].append(data)
-
-        #for name, data in attrBuffers.items():
-        #    print("%s: %s" % (
-        #        name, ' '.join(map(str, data[0:16]))
-        #    ))
-        return attrBuffers
+
+        vtxMap, idxBuf = np.unique(self.lod.idx_buf, return_inverse=True)
+        if len(vtxMap) > 0 and vtxMap[-1] >= vertices.count:
+            log.error("LOD uses vertex %d, but FVTX only has %d",
+                vtxMap[-1], vertices.count)
+            raise MalformedFileError("LOD submesh vertices are out of bounds")
+
+        attrBuffers = {name: arr[vtxMap] for name, arr in vertices.items()}
+        return attrBuffers, idxBuf.astype(np.uint32).reshape(-1), vtxMap
 
 
     def _createMesh(self):
         p0   = self.attrBuffers['_p0']
         n0   = self.attrBuffers['_n0']
-        idxs = self.lod.idx_buf
-        # the game doesn't tell how many vertices each LOD has,
-        # but we can usually rely on this.
-        nVtxs = int(self.lod.header['idx_cnt'] / 3)
-        log.debug("LOD has %d vtxs, %d idxs", nVtxs, len(idxs))
+        idxs = self.idxBuf
+        log.debug("LOD has %d of %d vtxs, %d idxs", len(p0),
+            self.fvtx.header['num_vtxs'], len(idxs))
 
         # create a mesh and add faces to it
         mesh = bmesh.new()
@@ -125,7 +146,8 @@ class LodImporter:
 
         # Add material
         mat = self.fmdl.fmats[self.fshp.header['fmat_idx']]
-        mdata.materials.append(bpy.data.materials[mat.name])
+        mdata.materials.append(self.parent.materials.get(mat.name) or
+            bpy.data.materials[mat.name])
 
         return meshObj
 
@@ -221,19 +243,21 @@ class LodImporter:
             try: data = self.attrBuffers[attr]
             except KeyError: break
 
-            vMax  = self.fvtx.attrsByName[attr].format.get('max', 1)
+            # integer UVs are scaled after flipping V, so V becomes
+            # (1 - v) / max rather than 1 - v / max.
+            vMax  = self.fvtx.attrsByName[attr].format.get('max', 1) \
+                if data.dtype.kind in 'iu' else 1
+            data  = data[:, :2].astype(np.float64)
+            us    = data[:, 0] / vMax
+            vs    = (1 - data[:, 1]) / vMax
             mdata = self.meshObj.data
             uv_layer = mdata.uv_layers.new(name=attr)
             for i, poly in enumerate(mdata.polygons):
                 for j, loopIdx in enumerate(poly.loop_indices):
                     loop = mdata.loops[loopIdx]
                     uvloop = uv_layer.data[loopIdx]
-                    x, y = data[loop.vertex_index][:2]
-                    y = 1-y
-                    if isinstance(x, int):
-                        uvloop.uv.x, uvloop.uv.y = x/vMax, y/vMax
-                    else:
-                        uvloop.uv.x, uvloop.uv.y = x, y
+                    vtx  = loop.vertex_index
+                    uvloop.uv.x, uvloop.uv.y = us[vtx], vs[vtx]
             idx += 1
 
 
@@ -8,14 +8,24 @@ class MaterialImporter:
     """Imports material from FMDL."""
 
     def __init__(self, parent, fmdl):
+        self.parent   = parent
         self.fmdl     = fmdl
         self.operator = parent.operator
         self.context  = parent.context
 
 
     def importMaterial(self, fmat):
-        """Import specified material."""
+        """Import specified material.
+
+        A material whose name was already imported (eg by another
+        file in the same batch) is reused.
+        """
+        mat = self.parent.materials.get(fmat.name)
+        if mat is not None:
+            log.debug("Material '%s' already imported", fmat.name)
+            return mat
         mat = bpy.data.materials.new(name=fmat.name)
+        self.parent.materials[fmat.name] = mat
         mat.use_nodes = True
         mat_wrap = PrincipledBSDFWrapper(mat, is_readonly=False)
         self._addCustomProperties(fmat, mat)
@@ -37,13 +47,13 @@ class MaterialImporter:
             sampler = fragSamplerKey
             texName = texSampler['textureName']
 
-            if not bpy.data.images.get(texName):
+            image = self.parent.images.get(texName) or \
+                bpy.data.images.get(texName)
+            if image is None:
                 log.info ("Texture %s missing",
                     texName)
                 continue
 
-            image = bpy.data.images[texName]
-
             match sampler:
                 case "_a0": # albedo (regular texture)
                     if fmat.shaderOptions.get('emission_color_type') == '1':
@@ -126,5 +136,7 @@ class MaterialImporter:
         for name, val in fmat.shaderOptions.items():
             mat['shaderOption_'+name] = val
 
-        mat['samplers']    = fmat.samplerInfoList
+        # Blender needs plain dicts, not struct records
+        mat['samplers']    = [{'slot': s['slot'], 'data': dict(s['data'])}
+            for s in fmat.samplerInfoList]
         mat['section_idx'] = fmat.header['section_idx']
@@ -7,6 +7,7 @@ import os
 import os.path
 import numpy as np
 import time
+from concurrent.futures import Future
 
 class TextureImporter:
     """Imports texture images from BNTX archive."""
@@ -17,10 +18,35 @@ class TextureImporter:
         self.context  = parent.context
 
 
-    def importTextures(self, bntx):
-        """Import textures from BNTX."""
+    def decodeTextures(self, bntx) -> list:
+        """Start decoding the textures of a BNTX in the background.
+
+        Returns a list of Futures for the pixels of each texture (see
+        `_decodePixels()`), with None for textures already imported.
+        """
+        res = []
+        for i, tex in enumerate(bntx.textures):
+            if tex.name in self.parent.images: res.append(None)
+            else: res.append(self._decodePixels(bntx, i, tex))
+        return res
+
+
+    def importTextures(self, bntx, futures:list):
+        """Import textures from BNTX.
+
+        futures: Result of `decodeTextures()`.
+
+        The images are created right away, so materials can use
+        them, but left empty until `finishTextures()`.
+        Textures whose name was already imported (eg by another
+        file in the same batch) reuse that image.
+        """
         images = {}
         for i, tex in enumerate(bntx.textures):
+            if tex.name in self.parent.images:
+                log.debug("Texture '%s' already imported", tex.name)
+                images[tex.name] = self.parent.images[tex.name]
+                continue
             log.info("Importing texture %3d/%3d '%s' (%s)...",
                 i+1, len(bntx.textures), tex.name,
                 type(tex.format_).__name__)
@@ -29,30 +55,72 @@ class TextureImporter:
                 width=tex.width, height=tex.height)
             # image.use_alpha = True
 
-            offs   = 0
-            r,g,b,a = 0,0,0,0
-            ctype = [0, 255, r, g, b, a]
-            compSelect = tex.channel_types
-            
-            pixels = tex.format_.decodePixels(tex.pixels)
+            dumpPath = None
+            if self.operator.dump_textures:
+                base, ext = os.path.splitext(self.parent.path)
+                dumpPath  = "%s/%s/%s.png" % (base, bntx.name, tex.name)
+
+            images[tex.name] = image
+            self.parent.images[tex.name] = image
+            self.parent.pendingImages.append((image, futures[i], dumpPath))
+        return images
 
-            # flip image from dx to gl
-            pixels = np.flipud(pixels.reshape((tex.height, tex.width, 4)))
 
-            image.pixels = np.ravel(pixels)
+    def finishTextures(self, wait:bool=True):
+        """Fill in the images whose textures have been decoded.
+
+        wait: Whether to wait for those still being decoded, or
+            leave them for a later call.
+        """
+        pending = self.parent.pendingImages
+        waiting = []
+        for item in pending:
+            image, future, dumpPath = item
+            if not (wait or future.done()):
+                waiting.append(item)
+                continue
+            try: pixels = future.result()
+            except Exception:
+                log.exception("Failed to decode texture '%s'", image.name)
+                continue
+            image.pixels.foreach_set(np.ravel(pixels))
 
             # save to file
-            if self.operator.dump_textures:
-                base, ext = os.path.splitext(self.parent.path)
-                dirPath = "%s/%s" % (base, bntx.name)
-                os.makedirs(dirPath, exist_ok=True)
-                image.filepath_raw = "%s/%s.png" % (
-                    dirPath, tex.name)
+            if dumpPath is not None:
+                os.makedirs(os.path.dirname(dumpPath), exist_ok=True)
+                image.filepath_raw = dumpPath
                 image.file_format = 'PNG'
                 log.info("Saving image to %s", image.filepath_raw)
                 image.save()
 
             image.update()
             image.pack()
-            images[tex.name] = image
-        return images
+        pending[:] = waiting
+
+
+    def _decodePixels(self, bntx, idx, tex) -> Future:
+        """Start decoding texture to an array of RGBA pixels, bottom
+        row first, or get it from the cache.
+
+        Returns a Future for the pixels.
+        """
+        cache = self.parent.cache
+        name  = 'tex/%s/%d/%s' % (bntx.name, idx, tex.name)
+        if cache is not None:
+            arrays = cache.getArrays(name)
+            if arrays is not None:
+                future = Future()
+                future.set_result(arrays['rgba'])
+                return future
+
+        # flip image from dx to gl
+        future = self.parent.textureDecoder.submit(tex, flip=True)
+
+        # Blender keeps pixels as float32, which is how they're decoded.
+        if cache is not None:
+            def store(future):
+                if future.cancelled() or future.exception() is not None:
+                    return
+                cache.putArrays(name, {'rgba': future.result()})
+            future.add_done_callback(store)
+        return future
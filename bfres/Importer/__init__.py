@@ -1,2 +1,3 @@
 from .Importer import Importer
+from .BatchImporter import BatchImporter
 from .Preferences import BfresPreferences
@@ -0,0 +1,99 @@
+import logging; log = logging.getLogger(__name__)
+from ..BinaryStruct import BinaryStruct, BinaryObject
+from ..BinaryStruct.Padding import Padding
+from ..BinaryFile import BinaryFile
+from ..Exceptions import UnsupportedFormatError
+
+# SARC is a plain archive format. We only need enough of it to
+# pull files (eg zstd dictionaries) out of a pack.
+
+class Header(BinaryStruct):
+    """SARC header."""
+    magic  = b'SARC'
+    fields = (
+        ('4s', 'magic'),
+        ('H',  'header_size'),
+        ('H',  'byte_order'), # FEFF le or FFFE be
+        ('I',  'file_size'),
+        ('I',  'data_offset'),
+        ('H',  'version'),
+        Padding(2),
+    )
+    size = 0x14
+
+
+class SFATHeader(BinaryStruct):
+    """SARC file allocation table header."""
+    magic  = b'SFAT'
+    fields = (
+        ('4s', 'magic'),
+        ('H',  'header_size'),
+        ('H',  'num_nodes'),
+        ('I',  'hash_key'),
+    )
+    size = 0x0C
+
+
+class SFATNode(BinaryStruct):
+    """SARC file allocation table entry."""
+    fields = (
+        ('I', 'name_hash'),
+        ('I', 'name_attrs'), # high byte: flags; low 24 bits: offset/4
+        ('I', 'data_start'), # relative to data_offset
+        ('I', 'data_end'),
+    )
+    size = 0x10
+
+
+class SARC:
+    """SARC archive."""
+    Header = Header
+
+    def __init__(self, file:BinaryFile):
+        self.file   = file
+        self.files  = {} # name => (offset, size)
+        self.header = self.Header().readFromFile(file, 0)
+        if self.header['byte_order'] != 0xFEFF:
+            raise UnsupportedFormatError(
+                "Sorry, big-endian SARC files aren't supported")
+
+
+    def decode(self):
+        """Read the file table."""
+        offs  = self.header['header_size']
+        sfat  = SFATHeader().readFromFile(self.file, offs)
+        offs += SFATHeader.size
+        nodes = []
+        for i in range(sfat['num_nodes']):
+            nodes.append(SFATNode().readFromFile(self.file, offs))
+            offs += SFATNode.size
+
+        # SFNT header is 8 bytes; names follow, each 4-byte aligned.
+        namesOffs = offs + 8
+        dataOffs  = self.header['data_offset']
+        for i, node in enumerate(nodes):
+            if node['name_attrs'] & 0xFF000000:
+                nameOffs = namesOffs + (node['name_attrs'] & 0xFFFFFF) * 4
+                name = self._readName(nameOffs)
+            else:
+                name = '%08X' % node['name_hash']
+            self.files[name] = (dataOffs + node['data_start'],
+                node['data_end'] - node['data_start'])
+        return self
+
+
+    def _readName(self, offs):
+        """Read null-terminated file name."""
+        name = []
+        while True:
+            b = self.file.read(1, offs)
+            if b in (b'\0', b''): break
+            name.append(b)
+            offs += 1
+        return b''.join(name).decode('utf-8')
+
+
+    def read(self, name) -> bytes:
+        """Read the contents of the named file."""
+        offs, size = self.files[name]
+        return self.file.read(size, offs)
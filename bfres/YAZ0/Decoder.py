@@ -1,6 +1,8 @@
 import logging; log = logging.getLogger(__name__)
+import struct
 from ..BinaryStruct import BinaryStruct, BinaryObject, Offset
 from ..BinaryFile import BinaryFile
+from ..Exceptions import MalformedFileError
 
 class Header(BinaryStruct):
     """YAZ0 file header."""
@@ -11,83 +13,245 @@ class Header(BinaryStruct):
     )
 
 
+def decompressBuffer(src, size:int, srcPos:int=16,
+progressCallback=None) -> bytearray:
+    """Decompress a whole YAZ0 stream held in memory.
+
+    src:     The compressed file (bytes-like, including header).
+    size:    Decompressed size, from the header.
+    srcPos:  Offset of the first code byte in `src`.
+    progressCallback: Called as (cur, total) every 64K of output.
+
+    Returns a bytearray of `size` bytes.
+    """
+    out     = bytearray(size)
+    dst     = 0
+    srcLen  = len(src)
+    nextReport = 0x10000
+    try:
+        while dst < size:
+            code = src[srcPos]
+            srcPos += 1
+
+            # fast path: a full group of literals is one slice copy.
+            if code == 0xFF and dst + 8 <= size and srcPos + 8 <= srcLen:
+                out[dst:dst+8] = src[srcPos:srcPos+8]
+                dst    += 8
+                srcPos += 8
+
+            else:
+                for i in range(8):
+                    if dst >= size: break
+                    if code & 0x80: # copy next byte from input
+                        out[dst] = src[srcPos]
+                        dst    += 1
+                        srcPos += 1
+                    else: # repeat some bytes from output
+                        b1   = src[srcPos]
+                        dist = (((b1 & 0x0F) << 8) | src[srcPos+1]) + 1
+                        n    = b1 >> 4
+                        if n:
+                            n += 2
+                            srcPos += 2
+                        else:
+                            n = src[srcPos+2] + 0x12
+                            srcPos += 3
+                        copySrc = dst - dist
+                        if copySrc < 0:
+                            raise MalformedFileError(
+                                "YAZ0 back-reference before start of output at 0x%X" % dst)
+                        n = min(n, size - dst)
+                        if dist >= n: # no overlap, plain slice copy
+                            out[dst:dst+n] = out[copySrc:copySrc+n]
+                        else: # overlapping; repeat the last `dist` bytes
+                            reps, rem = divmod(n, dist)
+                            pattern = out[copySrc:dst]
+                            out[dst:dst+n] = pattern * reps + pattern[:rem]
+                        dst += n
+                    code <<= 1
+
+            if progressCallback is not None and dst >= nextReport:
+                progressCallback(dst, size)
+                nextReport = dst + 0x10000
+
+    except IndexError:
+        raise MalformedFileError(
+            "YAZ0 stream truncated (input 0x%X bytes, output 0x%X of 0x%X)" % (
+                srcLen, dst, size))
+
+    if progressCallback is not None: progressCallback(size, size)
+    return out
+
+
+WINDOW_SIZE   = 0x1000 # furthest back a match can refer to
+MAX_GROUP_LEN = 1 + (8 * 3) # code byte + 8 three-byte matches
+
+def decompressStream(file, size:int, blockSize:int=0x10000,
+chunkSize:int=0x10000, progressCallback=None):
+    """Decompress a YAZ0 stream incrementally.
+
+    file:      File-like object positioned at the first code byte.
+        Only `read()` is used, so pipes and sockets work.
+    size:      Decompressed size, from the header.
+    blockSize: Approximate size of the blocks to yield.
+    chunkSize: How much compressed input to read at a time.
+    progressCallback: Called as (cur, total) after each block.
+
+    Yields `bytes` blocks of the decompressed data. Only the last
+    `WINDOW_SIZE` bytes of output are kept between blocks, so memory
+    use does not depend on the size of the stream.
+    """
+    chunkSize = max(chunkSize, MAX_GROUP_LEN)
+    src     = b''
+    srcPos  = 0
+    eof     = False
+    out     = bytearray() # sliding window + pending output
+    pending = 0 # start of not-yet-yielded data in `out`
+    done    = 0 # total bytes decompressed so far
+    while done < size:
+        # make sure a whole code group is buffered
+        if len(src) - srcPos < MAX_GROUP_LEN and not eof:
+            parts = [src[srcPos:]]
+            have  = len(parts[0])
+            while have < chunkSize:
+                chunk = file.read(chunkSize)
+                if not chunk:
+                    eof = True
+                    break
+                parts.append(chunk)
+                have += len(chunk)
+            src    = b''.join(parts)
+            srcPos = 0
+
+        try:
+            code = src[srcPos]
+            srcPos += 1
+            if code == 0xFF and done + 8 <= size and srcPos + 8 <= len(src):
+                out    += src[srcPos:srcPos+8]
+                srcPos += 8
+                done   += 8
+            else:
+                for i in range(8):
+                    if done >= size: break
+                    if code & 0x80: # copy next byte from input
+                        out.append(src[srcPos])
+                        srcPos += 1
+                        done   += 1
+                    else: # repeat some bytes from output
+                        b1   = src[srcPos]
+                        dist = (((b1 & 0x0F) << 8) | src[srcPos+1]) + 1
+                        n    = b1 >> 4
+                        if n:
+                            n += 2
+                            srcPos += 2
+                        else:
+                            n = src[srcPos+2] + 0x12
+                            srcPos += 3
+                        copySrc = len(out) - dist
+                        if copySrc < 0:
+                            raise MalformedFileError(
+                                "YAZ0 back-reference before start of output at 0x%X" % done)
+                        n = min(n, size - done)
+                        if dist >= n:
+                            out += out[copySrc:copySrc+n]
+                        else:
+                            reps, rem = divmod(n, dist)
+                            pattern = out[copySrc:]
+                            out += pattern * reps + pattern[:rem]
+                        done += n
+                    code <<= 1
+        except IndexError:
+            raise MalformedFileError(
+                "YAZ0 stream truncated (output 0x%X of 0x%X)" % (
+                    done, size))
+
+        if len(out) - pending >= blockSize:
+            yield bytes(out[pending:])
+            # keep only what a back-reference can still reach
+            del out[:-WINDOW_SIZE]
+            pending = len(out)
+            if progressCallback is not None:
+                progressCallback(done, size)
+
+    if len(out) > pending:
+        yield bytes(out[pending:])
+    if progressCallback is not None: progressCallback(size, size)
+
+
 class Decoder:
-    """YAZ0 decoder."""
+    """YAZ0 decoder.
+
+    file: A BinaryFile, or any file-like object with a `read()`
+        method (eg a pipe), positioned at the YAZ0 header.
+    """
     def __init__(self, file:BinaryFile, progressCallback=None):
         self.file     = file
-        self.header   = Header().readFromFile(file)
+        if isinstance(file, BinaryFile):
+            self.header = Header().readFromFile(file)
+        else: # plain stream; can't seek, so parse the header by hand
+            magic, size = struct.unpack('>4sI', file.read(16)[0:8])
+            if magic not in Header.magic:
+                raise ValueError("Header: invalid magic %s; expected %s" % (
+                    str(magic), str(Header.magic)))
+            self.header = {'magic':magic, 'size':size}
         self.src_pos  = 16
-        self.dest_pos = 0
         self.size     = self.header['size']
-        self.dest_end = self.size
-        self._output  = []
-        self._outputStart = 0
+        self._data    = None
+        self._readPos = 0
         if progressCallback is None:
             progressCallback = lambda cur, total: cur
         self.progressCallback = progressCallback
         progressCallback(0, self.size)
 
 
-    def _nextByte(self) -> bytes:
-        """Return next byte from input, or EOF."""
-        self.file.seek(self.src_pos)
-        self.src_pos += 1
-        return self.file.read(1)[0]
-
-
-    def _outputByte(self, b:(int,bytes)) -> bytes:
-        """Write byte to output and return it."""
-        if type(b) is int: b = bytes((b,))
-        self._output.append(b)
-
-        # we only need to keep the last 0x1111 bytes of the output
-        # since that's the furthest back we can seek to copy from.
-        excess = len(self._output) - 0x1111
-        if excess > 0:
-            self._output = self._output[-0x1111:]
-            self._outputStart += excess
-
-        self.dest_pos += 1
-        if self.dest_pos & 0x3FF == 0 or self.dest_pos >= self.size:
-            self.progressCallback(self.dest_pos, self.size)
-        return b
-
-
-    def bytes(self):
-        """Generator that yields bytes from the decompressed stream."""
-        code     = 0
-        code_len = 0
-        while self.dest_pos < self.dest_end:
-            if not code_len:
-                code = self._nextByte()
-                code_len = 8
-            if code & 0x80: # output next byte from input
-                yield self._outputByte(self._nextByte())
-            else: # repeat some bytes from output
-                b1 = self._nextByte()
-                b2 = self._nextByte()
-                offs = ((b1 & 0x0F) << 8) | b2
-                copy_src = self.dest_pos - (offs & 0xFFF) - 1
-                n = b1 >> 4
-                if n: n += 2
-                else: n = self._nextByte() + 0x12
-                assert (3 <= n <= 0x111)
-                for i in range(n):
-                    p = copy_src - self._outputStart
-                    yield self._outputByte(self._output[p])
-                    copy_src += 1
-            code <<= 1
-            code_len -= 1
+    def decompress(self) -> bytearray:
+        """Decompress the entire stream and return it.
+
+        The compressed input is read into memory in one go and
+        decoded into a preallocated buffer.
+        """
+        if self._data is None:
+            if isinstance(self.file, BinaryFile):
+                src = self.file.view(self.file.size, 0)
+            else:
+                src = bytes(self.src_pos) + self.file.read()
+            self._data = decompressBuffer(src, self.size, self.src_pos,
+                self.progressCallback)
+        return self._data
+
+
+    def blocks(self, blockSize:int=0x10000, chunkSize:int=0x10000):
+        """Generator that decompresses the stream incrementally,
+        yielding blocks of about `blockSize` bytes.
+
+        Memory use stays constant regardless of the stream size.
+        """
+        file = self.file
+        if isinstance(file, BinaryFile):
+            file.seek(self.src_pos)
+            file = file.file
+        return decompressStream(file, self.size, blockSize, chunkSize,
+            self.progressCallback)
+
+
+    def bytes(self, blockSize:int=0x10000):
+        """Generator that yields blocks from the decompressed stream."""
+        if self._data is None:
+            yield from self.blocks(blockSize)
+            return
+        data = memoryview(self._data)
+        for offs in range(0, len(data), blockSize):
+            yield bytes(data[offs:offs+blockSize])
 
 
     def read(self, size:int=-1) -> bytes:
         """File-like interface for reading decompressed stream."""
-        res = []
-        data = self.bytes()
-        while size < 0 or len(res) < size:
-            try: res.append(next(data))
-            except StopIteration: break
-        return b''.join(res)
+        data  = self.decompress()
+        start = self._readPos
+        if size < 0: end = len(data)
+        else: end = min(start + size, len(data))
+        self._readPos = end
+        return bytes(data[start:end])
 
 
     def __str__(self):
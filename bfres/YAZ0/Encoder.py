@@ -0,0 +1,211 @@
+import logging; log = logging.getLogger(__name__)
+import struct
+import time
+
+MIN_MATCH   = 3
+MAX_MATCH   = 0x111
+WINDOW_SIZE = 0x1000
+
+
+class Encoder:
+    """YAZ0 encoder.
+
+    strategy: How to search for matches:
+        'fast': Hash chains over 3-byte prefixes, checking only the
+            `maxChain` most recent candidates. Greedy parsing.
+            Good for iteration builds.
+        'best': Exhaustive search of the whole window for the
+            longest match, with a one-byte lookahead. Compresses
+            at least as well as 'fast', but is much slower.
+    maxChain: Number of candidates to check per position in
+        'fast' mode.
+
+    After `encode()`, `stats` holds the input/output sizes, ratio
+    and throughput of the last run.
+    """
+    strategies = ('fast', 'best')
+
+    def __init__(self, strategy:str='fast', maxChain:int=16,
+    progressCallback=None):
+        if strategy not in self.strategies:
+            raise ValueError("Unknown YAZ0 strategy '%s' (expected one of %s)" % (
+                strategy, ', '.join(self.strategies)))
+        self.strategy = strategy
+        self.maxChain = maxChain
+        self.stats    = None
+        if progressCallback is None:
+            progressCallback = lambda cur, total: cur
+        self.progressCallback = progressCallback
+
+
+    def encode(self, data:bytes, magic:bytes=b'Yaz0',
+    alignment:int=0) -> bytes:
+        """Compress `data` and return the YAZ0 file contents."""
+        data  = bytes(data)
+        start = time.perf_counter()
+        out   = bytearray(struct.pack('>4sII4x', magic, len(data),
+            alignment))
+
+        if self.strategy == 'fast':
+            matches = self._matchesFast(data)
+        else:
+            matches = self._matchesBest(data)
+        self._writeGroups(data, matches, out)
+
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            'strategy': self.strategy,
+            'inSize':   len(data),
+            'outSize':  len(out),
+            'ratio':    len(out) / len(data) if data else 1.0,
+            'seconds':  elapsed,
+            'mbPerSec': (len(data) / elapsed / 1e6) if elapsed else 0.0,
+        }
+        log.debug("YAZ0 %s: 0x%X -> 0x%X bytes (%.1f%%) at %.2f MB/s",
+            self.strategy, len(data), len(out),
+            self.stats['ratio'] * 100, self.stats['mbPerSec'])
+        return bytes(out)
+
+
+    def _writeGroups(self, data, matches, out):
+        """Write the parsed stream as YAZ0 code groups.
+
+        matches: Iterable of (pos, length, dist); length 0 means a
+            literal byte at `pos`.
+        """
+        code    = 0
+        bit     = 0 # start a new group on the first item
+        codePos = None
+        for pos, length, dist in matches:
+            if bit == 0:
+                if codePos is not None: out[codePos] = code
+                code    = 0
+                bit     = 0x80
+                codePos = len(out)
+                out.append(0)
+
+            if length == 0:
+                code |= bit
+                out.append(data[pos])
+            else:
+                dist -= 1
+                if length >= 0x12:
+                    out += bytes((dist >> 8, dist & 0xFF, length - 0x12))
+                else:
+                    out += bytes((((length - 2) << 4) | (dist >> 8),
+                        dist & 0xFF))
+            bit >>= 1
+        if codePos is not None: out[codePos] = code
+
+
+    def _matchLength(self, data, pos, cand, limit, n=MIN_MATCH):
+        """Count matching bytes between `pos` and `cand`, given that
+        the first `n` are already known to match.
+        """
+        while n < limit and data[cand+n] == data[pos+n]:
+            n += 1
+        return n
+
+
+    def _matchesFast(self, data):
+        """Greedy parse using hash chains."""
+        size   = len(data)
+        chains = {}
+        pos    = 0
+        nextReport = 0x10000
+        while pos < size:
+            limit  = min(MAX_MATCH, size - pos)
+            best   = 0
+            bestAt = 0
+            if limit >= MIN_MATCH:
+                key   = data[pos:pos+MIN_MATCH]
+                chain = chains.get(key)
+                if chain is not None:
+                    floor = pos - WINDOW_SIZE
+                    for cand in reversed(chain[-self.maxChain:]):
+                        if cand < floor: break
+                        n = self._matchLength(data, pos, cand, limit)
+                        if n > best:
+                            best, bestAt = n, cand
+                            if n == limit: break
+
+            if best >= MIN_MATCH:
+                yield pos, best, pos - bestAt
+                step = best
+            else:
+                yield pos, 0, 0
+                step = 1
+
+            # index every position we skip over
+            for p in range(pos, min(pos + step, size - MIN_MATCH + 1)):
+                key = data[p:p+MIN_MATCH]
+                chain = chains.get(key)
+                if chain is None: chains[key] = [p]
+                else: chain.append(p)
+            pos += step
+
+            if pos >= nextReport:
+                self.progressCallback(pos, size)
+                nextReport = pos + 0x10000
+        self.progressCallback(size, size)
+
+
+    def _longestMatch(self, data, pos):
+        """Find the longest (and nearest) match for `pos` anywhere
+        in the window.
+
+        Returns (length, dist); length < MIN_MATCH if none.
+        """
+        limit = min(MAX_MATCH, len(data) - pos)
+        if limit < MIN_MATCH: return 0, 0
+        start  = max(0, pos - WINDOW_SIZE)
+        best   = 0
+        bestAt = 0
+        need   = MIN_MATCH
+        while need <= limit:
+            # any match longer than `best` must contain this prefix.
+            # the end bound allows overlap with the current position.
+            cand = data.rfind(data[pos:pos+need], start, pos + need - 1)
+            if cand < 0: break
+            best   = self._matchLength(data, pos, cand, limit, need)
+            bestAt = cand
+            need   = best + 1
+        if best < MIN_MATCH: return 0, 0
+        return best, pos - bestAt
+
+
+    def _matchesBest(self, data):
+        """Exhaustive parse with a one-byte lookahead."""
+        size = len(data)
+        pos  = 0
+        nextReport = 0x10000
+        ahead = None
+        while pos < size:
+            if ahead is not None:
+                length, dist = ahead
+                ahead = None
+            else:
+                length, dist = self._longestMatch(data, pos)
+                if length >= MIN_MATCH:
+                    # if the next position has a much better match,
+                    # emit a literal here and take that one instead.
+                    nextLen, nextDist = self._longestMatch(data, pos+1)
+                    if nextLen >= length + 2:
+                        ahead  = (nextLen, nextDist)
+                        length = 0
+
+            if length >= MIN_MATCH:
+                yield pos, length, dist
+                pos += length
+            else:
+                yield pos, 0, 0
+                pos += 1
+
+            if pos >= nextReport:
+                self.progressCallback(pos, size)
+                nextReport = pos + 0x10000
+        self.progressCallback(size, size)
+
+
+    def __str__(self):
+        return "<Yaz0 encoder (%s) at 0x%x>" % (self.strategy, id(self))
@@ -1,8 +1,19 @@
 import logging; log = logging.getLogger(__name__)
-from .Decoder import Decoder
+from .Decoder import Decoder, decompressBuffer, decompressStream
+from .Encoder import Encoder
 
 def decompressFile(infile, outfile):
     """Decompress from `infile` to `outfile`."""
     decoder = Decoder(infile)
-    for data in decoder.bytes():
+    for data in decoder.blocks():
         outfile.write(data)
+
+
+def compressFile(infile, outfile, strategy='fast'):
+    """Compress from `infile` to `outfile`.
+
+    Returns the encoder's stats (ratio and throughput).
+    """
+    encoder = Encoder(strategy)
+    outfile.write(encoder.encode(infile.read()))
+    return encoder.stats
@@ -0,0 +1,151 @@
+import logging; log = logging.getLogger(__name__)
+import os
+import os.path
+import tempfile
+import zstandard
+from ..BinaryFile import BinaryFile
+from ..SARC import SARC
+from ..Exceptions import UnsupportedFormatError
+
+MAGIC      = b'(\xb5/\xfd'
+DICT_MAGIC = b'\x37\xa4\x30\xec'
+FRAME_HEADER_SIZE_MAX = 18
+
+# Decompression contexts are expensive to build, especially with a
+# dictionary, so they are kept for the whole session.
+_decompressors = {} # dict ID => ZstdDecompressor
+_loadedPacks   = set() # paths of dictionary packs already loaded
+
+
+def getDecompressor(dictId:int=0):
+    """Get the (cached) decompressor for the given dictionary ID."""
+    dctx = _decompressors.get(dictId)
+    if dctx is None:
+        if dictId != 0:
+            raise UnsupportedFormatError(
+                "File needs zstd dictionary 0x%08X, which isn't loaded" % dictId)
+        dctx = zstandard.ZstdDecompressor()
+        _decompressors[0] = dctx
+    return dctx
+
+
+def loadDictionary(data:bytes, name:str='?') -> int:
+    """Load a zstd dictionary and cache a decompressor for it.
+
+    Returns the dictionary ID.
+    """
+    zdict  = zstandard.ZstdCompressionDict(bytes(data))
+    dictId = zdict.dict_id()
+    if dictId not in _decompressors:
+        log.debug("Loaded zstd dictionary '%s' (ID 0x%08X)", name, dictId)
+        _decompressors[dictId] = zstandard.ZstdDecompressor(dict_data=zdict)
+    return dictId
+
+
+def loadDictionaryPack(path:str) -> int:
+    """Load every dictionary from a pack such as `ZsDic.pack.zs`.
+
+    Each pack is only read once per session.
+    Returns the number of dictionaries loaded.
+    """
+    path = os.path.abspath(path)
+    if path in _loadedPacks: return 0
+
+    with open(path, 'rb') as file:
+        data = file.read()
+    if data[0:4] == MAGIC:
+        data = getDecompressor(0).stream_reader(data).read()
+    pack = SARC(BinaryFile(data, name=path)).decode()
+
+    count = 0
+    for name in pack.files:
+        contents = pack.read(name)
+        if contents[0:4] == DICT_MAGIC:
+            loadDictionary(contents, name)
+            count += 1
+    _loadedPacks.add(path)
+    log.info("Loaded %d zstd dictionaries from %s", count, path)
+    return count
+
+
+def findDictionaryPack(path:str):
+    """Look for the game's dictionary pack near `path`.
+
+    Checks each parent directory for `Pack/ZsDic.pack.zs` (the
+    usual romfs layout) or a `ZsDic.pack.zs` beside it.
+    Returns the path, or None if not found.
+    """
+    names = (
+        os.path.join('Pack', 'ZsDic.pack.zs'),
+        'ZsDic.pack.zs',
+        os.path.join('Pack', 'ZsDic.pack'),
+        'ZsDic.pack',
+    )
+    path = os.path.dirname(os.path.abspath(path))
+    while True:
+        for name in names:
+            candidate = os.path.join(path, name)
+            if os.path.isfile(candidate): return candidate
+        parent = os.path.dirname(path)
+        if parent == path: return None
+        path = parent
+
+
+def frameDictId(file:BinaryFile) -> int:
+    """Get the dictionary ID from a zstd frame header."""
+    header = file.read(min(file.size, FRAME_HEADER_SIZE_MAX), 0)
+    return zstandard.get_frame_parameters(header).dict_id
+
+
+def decompressFile(file:BinaryFile, maxInMemory:int=None,
+chunkSize:int=0x100000):
+    """Decompress a zstd file incrementally.
+
+    file:        The compressed file.
+    maxInMemory: Largest output to keep in memory. If the output
+        grows beyond this, it's moved to a temporary file.
+        None for no limit.
+    chunkSize:   How much to decompress at a time.
+
+    Works for frames that don't record their content size.
+    Returns a bytearray, or a temporary file object positioned at
+    the start of the data.
+    """
+    header = file.read(min(file.size, FRAME_HEADER_SIZE_MAX), 0)
+    params = zstandard.get_frame_parameters(header)
+    dctx   = getDecompressor(params.dict_id)
+    file.seek(0)
+    reader = dctx.stream_reader(file.file, read_size=chunkSize,
+        closefd=False)
+
+    size = params.content_size
+    if size != zstandard.CONTENTSIZE_UNKNOWN and \
+    (maxInMemory is None or size <= maxInMemory):
+        # known size: read straight into the final buffer.
+        out  = bytearray(size)
+        view = memoryview(out)
+        pos  = 0
+        while pos < size:
+            n = reader.readinto(view[pos:pos+chunkSize])
+            if n == 0: break
+            pos += n
+        view.release()
+        if pos < size: del out[pos:]
+        return out
+
+    # unknown or too large: buffer until we pass the limit.
+    out = bytearray()
+    while maxInMemory is None or len(out) <= maxInMemory:
+        chunk = reader.read(chunkSize)
+        if not chunk: return out
+        out += chunk
+
+    result = tempfile.TemporaryFile()
+    result.write(out)
+    del out
+    while True:
+        chunk = reader.read(chunkSize)
+        if not chunk: break
+        result.write(chunk)
+    result.seek(0)
+    return result
@@ -0,0 +1,4 @@
+import sys
+from .CLI import main
+
+sys.exit(main())
@@ -0,0 +1,6 @@
+import os.path
+import sys
+
+# the repo root is a Blender add-on, so import the `bfres` package
+# directly.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,92 @@
+"""Check the array attribute converters against the scalar ones."""
+import struct
+import numpy as np
+import pytest
+from bfres.BinaryFile import arrayType
+from bfres.FRES.FMDL.Attribute.types import (attrFmts, getArrayFunc,
+    normalizeArray, unpackArmHalfFloat)
+
+NUM_VTXS = 2000
+
+# raw values that exercise the edge cases of each format.
+edgeValues = {
+    # ARM half floats: ±0, subnormals, smallest/largest normal,
+    # 1.0, and exponent 31, which ARM treats as a normal exponent.
+    'H': [0x0000, 0x8000, 0x0001, 0x8001, 0x03FF, 0x83FF, 0x0400,
+        0x3C00, 0xBC00, 0x3E00, 0x7BFF, 0x7C00, 0xFC00, 0x7C01,
+        0x7FFF, 0xFFFF],
+    # 10-10-10-2: each field's extremes (-512, -511, -1, 0, 511)
+    # and all of w's values.
+    'I': [0x00000000, 0x00000200, 0x00000201, 0x000003FF, 0x000001FF,
+        0x20080200, 0x1FF7FDFF, 0x3FFFFFFF, 0x40000000, 0x80000000,
+        0xC0000000, 0xFFFFFFFF],
+}
+
+
+def _rawValues(fmt:str) -> bytes:
+    """Random vertices in the given format, starting with the
+    edge cases for its type.
+    """
+    size = struct.calcsize('<' + fmt)
+    raw  = np.random.default_rng(0).integers(0, 256, NUM_VTXS*size,
+        dtype=np.uint8).tobytes()
+    edge = edgeValues.get(fmt[-1])
+    if edge is None: return raw
+    edge = np.array(edge, dtype='<'+fmt[-1]).tobytes()
+    return edge + raw[len(edge):]
+
+
+def _scalar(fmt:dict, raw:bytes) -> list:
+    size = struct.calcsize('<' + fmt['fmt'])
+    vals = [struct.unpack_from('<' + fmt['fmt'], raw, i*size)
+        for i in range(len(raw) // size)]
+    func = fmt.get('func')
+    if func: vals = [func(v) for v in vals]
+    return vals
+
+
+def _array(fmt:dict, raw:bytes) -> np.ndarray:
+    dtype, count = arrayType('<' + fmt['fmt'])
+    arr   = np.frombuffer(raw, dtype).reshape(-1, count)
+    func  = getArrayFunc(fmt)
+    if func: arr = func(arr)
+    return arr
+
+
+@pytest.mark.parametrize('fmtId', sorted(attrFmts), ids=hex)
+def test_arrayMatchesScalar(fmtId):
+    fmt = attrFmts[fmtId]
+    raw = _rawValues(fmt['fmt'])
+    arr = _array(fmt, raw)
+    ref = np.asarray(_scalar(fmt, raw), dtype=np.float64) \
+        .reshape(len(arr), -1)
+    # the array versions give float32, which is what's imported.
+    if arr.dtype == np.float32: ref = ref.astype(np.float32)
+    assert arr.shape == ref.shape
+    assert np.array_equal(arr, ref, equal_nan=(arr.dtype.kind == 'f'))
+
+
+@pytest.mark.parametrize('fmtId', sorted(attrFmts), ids=hex)
+def test_normalizeArray(fmtId):
+    fmt = attrFmts[fmtId]
+    arr = _array(fmt, _rawValues(fmt['fmt']))
+    res = normalizeArray(fmt, arr)
+    if arr.dtype.kind not in 'iu':
+        assert res is arr
+        return
+    lo = -1 if fmt['min'] < 0 else 0
+    assert res.dtype == np.float32
+    assert res.min() >= lo and res.max() <= 1
+    assert np.allclose(res, np.maximum(arr / fmt['max'], lo))
+
+
+def test_unpackArmHalfFloat():
+    assert unpackArmHalfFloat(0x3C00) == 1.0
+    assert unpackArmHalfFloat(0x3E00) == 1.5
+    assert unpackArmHalfFloat(0xC000) == -2.0
+    assert unpackArmHalfFloat(0x8000) == 0.0
+    assert unpackArmHalfFloat(0x0001) == 2.0 ** -24
+    assert unpackArmHalfFloat(0x7C00) == 65536.0 # no Inf in ARM format
+    assert unpackArmHalfFloat(0x7FFF) == 131008.0
+    # the largest mantissa is just below the next power of two.
+    assert unpackArmHalfFloat(0x3BFF) < unpackArmHalfFloat(0x3C00)
@@ -0,0 +1,75 @@
+"""Round-trip the YAZ0 encoder through both decoders."""
+import io
+import random
+import pytest
+from bfres import YAZ0
+from bfres.YAZ0.Decoder import WINDOW_SIZE, decompressStream
+from bfres.YAZ0.Encoder import MAX_MATCH
+
+
+def _random(size:int, seed:int=0) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+def _samples() -> dict:
+    block = _random(0x300, 1)
+    return {
+        'empty':       b'',
+        'one byte':    b'\x42',
+        'two bytes':   b'\x42\x42',
+        'min match':   b'abcabc',
+        'zeros 0x111': bytes(MAX_MATCH),
+        'zeros 0x112': bytes(MAX_MATCH + 1),
+        'zeros window+1': bytes(WINDOW_SIZE + 1),
+        'zeros 0x5000': bytes(0x5000),
+        'repeat 3':    b'abc' * 0x800,
+        'repeat 0x111': (b'x' * MAX_MATCH + b'y') * 20,
+        'text':        b'the quick brown fox jumps over the lazy dog. ' * 200,
+        # matches exactly at, and just past, the window's reach
+        'window edge': block + _random(WINDOW_SIZE - len(block), 2)
+            + block + _random(1, 3) + block,
+        'random':      _random(0x2345, 4),
+        'random window+1': _random(WINDOW_SIZE + 1, 5),
+        'mixed':       _random(0x800, 6) + bytes(0x1200) + _random(0x900, 7)
+            + b'ab' * 0x400,
+    }
+
+samples = _samples()
+
+
+@pytest.mark.parametrize('strategy', YAZ0.Encoder.strategies)
+@pytest.mark.parametrize('name', samples)
+def test_roundTrip(strategy, name):
+    data    = samples[name]
+    encoder = YAZ0.Encoder(strategy)
+    enc     = encoder.encode(data)
+    assert enc[0:4] == b'Yaz0'
+    assert int.from_bytes(enc[4:8], 'big') == len(data)
+    assert encoder.stats['inSize'] == len(data)
+    assert encoder.stats['outSize'] == len(enc)
+
+    # whole-buffer decoder
+    assert bytes(YAZ0.decompressBuffer(enc, len(data))) == data
+
+    # streaming decoder, with small blocks and input chunks so their
+    # boundaries fall inside code groups and back-references.
+    for blockSize, chunkSize in ((0x10000, 0x10000), (0x100, 0x20), (1, 1)):
+        out = b''.join(decompressStream(io.BytesIO(enc[16:]), len(data),
+            blockSize, chunkSize))
+        assert out == data, (blockSize, chunkSize)
+
+    # Decoder, from a plain stream
+    decoder = YAZ0.Decoder(io.BytesIO(enc))
+    assert b''.join(decoder.blocks(0x400, 0x40)) == data
+
+
+def test_bestIsNoWorseThanFast():
+    for name in ('text', 'mixed', 'window edge'):
+        fast = YAZ0.Encoder('fast').encode(samples[name])
+        best = YAZ0.Encoder('best').encode(samples[name])
+        assert len(best) <= len(fast), name
+
+
+def test_unknownStrategy():
+    with pytest.raises(ValueError):
+        YAZ0.Encoder('slow')